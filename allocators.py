@@ -0,0 +1,163 @@
+import itertools
+import random
+import string
+from typing import Optional
+
+MASK64 = (1 << 64) - 1
+
+# 数值类型可分配的取值范围 [low, high)
+INTEGER_RANGES = {
+    'byte': (1, 1 << 7), 'Byte': (1, 1 << 7),
+    'short': (1, 1 << 15), 'Short': (1, 1 << 15),
+    'int': (1, 1 << 31), 'Integer': (1, 1 << 31),
+    'long': (1, 1 << 63), 'Long': (1, 1 << 63), 'BigInteger': (1, 1 << 63)
+}
+
+
+def mix64(value: int, key: int) -> int:
+    """splitmix64 风格的混合函数，用作 Feistel 轮函数和子树种子的派生"""
+    z = (value + key) * 0x9E3779B97F4A7C15 & MASK64
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & MASK64
+    return z ^ (z >> 31)
+
+
+class ExhaustedError(ValueError):
+    """取值空间已分配完"""
+
+
+class SequenceAllocator:
+    """单调递增序列；分片之间按 index * shard_count + shard 交错，互不重复"""
+
+    def __init__(self, start: int = 1, step: int = 1, limit: Optional[int] = None,
+                 shard: int = 0, shard_count: int = 1):
+        if not 0 <= shard < shard_count:
+            raise ValueError("shard must be in [0, shard_count)")
+        self.start = start
+        self.step = step
+        self.limit = limit
+        self.shard = shard
+        self.shard_count = shard_count
+        # itertools.count 的 next() 在 GIL 下是原子操作，可多线程共享
+        self._counter = itertools.count()
+
+    def _at(self, index: int) -> int:
+        value = self.start + (index * self.shard_count + self.shard) * self.step
+        if self.limit is not None and value >= self.limit:
+            raise ExhaustedError(f"Sequence exhausted at {self.limit}")
+        return value
+
+    def allocate(self) -> int:
+        return self._at(next(self._counter))
+
+    def nth(self, index: int, seed: int = 0) -> int:
+        """本分片的第 index 个值，不推进计数器；序列总是从头编号，忽略 seed"""
+        return self._at(index)
+
+    def clone(self) -> 'SequenceAllocator':
+        """相同配置、从头开始的新分配器"""
+        return SequenceAllocator(self.start, self.step, self.limit, self.shard, self.shard_count)
+
+
+class PermutationAllocator:
+    """区间 [low, high) 上的双射置换：结果唯一且看起来随机，无需记录已分配的值"""
+
+    ROUNDS = 4
+
+    def __init__(self, low: int, high: int, seed: int = 0, shard: int = 0, shard_count: int = 1):
+        if high <= low:
+            raise ValueError("high must be greater than low")
+        if not 0 <= shard < shard_count:
+            raise ValueError("shard must be in [0, shard_count)")
+        self.low = low
+        self.high = high
+        self.seed = seed
+        self.shard = shard
+        self.shard_count = shard_count
+        self.size = high - low
+        # 取偶数位宽的 Feistel 网络，定义域不超过区间大小的 4 倍
+        self.half_bits = max(1, ((self.size - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        rng = random.Random(seed)
+        self.keys = [rng.getrandbits(64) for _ in range(self.ROUNDS)]
+        self._counter = itertools.count()
+
+    def _feistel(self, value: int) -> int:
+        left = value >> self.half_bits
+        right = value & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ (mix64(right, key) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def permute(self, index: int) -> int:
+        """将 [0, size) 中的序号映射为 [0, size) 中的另一个值（循环游走保证落在区间内）"""
+        value = self._feistel(index)
+        while value >= self.size:
+            value = self._feistel(value)
+        return value
+
+    def _at(self, index: int) -> int:
+        index = index * self.shard_count + self.shard
+        if index >= self.size:
+            raise ExhaustedError(f"Range [{self.low}, {self.high}) exhausted")
+        return self.low + self.permute(index)
+
+    def allocate(self) -> int:
+        return self._at(next(self._counter))
+
+    def nth(self, index: int, seed: int = 0) -> int:
+        """
+        本分片的第 index 个值，不推进计数器；seed 决定序号的起点，
+        同一 seed 下不同的 index 得到不同的值
+        """
+        capacity = (self.size - self.shard + self.shard_count - 1) // self.shard_count
+        if index >= capacity:
+            raise ExhaustedError(f"Range [{self.low}, {self.high}) exhausted")
+        return self._at((index + seed) % capacity)
+
+    def clone(self) -> 'PermutationAllocator':
+        return PermutationAllocator(self.low, self.high, self.seed, self.shard, self.shard_count)
+
+
+class UniqueStringAllocator:
+    """定长唯一字符串：对序号做置换后按字母表编码"""
+
+    def __init__(self, length: int = 8, alphabet: str = string.ascii_letters, seed: int = 0,
+                 shard: int = 0, shard_count: int = 1):
+        self.length = length
+        self.alphabet = alphabet
+        self.permutation = PermutationAllocator(0, len(alphabet) ** length, seed, shard, shard_count)
+
+    def allocate(self) -> str:
+        return self._encode(self.permutation.allocate())
+
+    def nth(self, index: int, seed: int = 0) -> str:
+        return self._encode(self.permutation.nth(index, seed))
+
+    def _encode(self, value: int) -> str:
+        base = len(self.alphabet)
+        chars = []
+        for _ in range(self.length):
+            value, remainder = divmod(value, base)
+            chars.append(self.alphabet[remainder])
+        return ''.join(chars)
+
+    def clone(self) -> 'UniqueStringAllocator':
+        permutation = self.permutation
+        return UniqueStringAllocator(self.length, self.alphabet, permutation.seed,
+                                     permutation.shard, permutation.shard_count)
+
+
+def create_allocator(type_name: str, strategy: str = 'sequence', seed: int = 0,
+                     shard: int = 0, shard_count: int = 1):
+    """按字段类型和策略创建唯一值分配器，不支持的类型返回 None"""
+    if strategy not in ('sequence', 'permutation'):
+        raise ValueError(f"Unknown id strategy: {strategy}")
+    if type_name == 'String':
+        return UniqueStringAllocator(seed=seed, shard=shard, shard_count=shard_count)
+    if type_name not in INTEGER_RANGES:
+        return None
+    low, high = INTEGER_RANGES[type_name]
+    if strategy == 'permutation':
+        return PermutationAllocator(low, high, seed, shard, shard_count)
+    return SequenceAllocator(start=low, limit=high, shard=shard, shard_count=shard_count)
@@ -0,0 +1,158 @@
+import fnmatch
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from parse_java import JavaEntityParser
+
+# 每个进程任务处理的源文件数量，减少进程间通信次数
+BATCH_SIZE = 64
+
+
+def _package_of(entry_name: str) -> str:
+    """根据归档内路径推断包名"""
+    directory = os.path.dirname(entry_name)
+    return directory.replace('/', '.')
+
+
+def _decode(data: bytes) -> str:
+    """解码源文件内容"""
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+
+def _parse_batch(batch: List[Tuple[str, bytes]]) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    """在工作进程中解析一批源文件"""
+    results = []
+    for name, data in batch:
+        try:
+            results.append((name, JavaEntityParser(_decode(data)).get_parsed_info(), None))
+        except Exception as e:
+            results.append((name, None, str(e)))
+    return results
+
+
+class ArchiveSourceLoader:
+    """从 -sources.jar / zip 归档中读取并解析 Java 源文件，合并为统一的类型注册表"""
+
+    def __init__(self, package_glob: Optional[str] = None, workers: Optional[int] = None):
+        self.package_glob = package_glob
+        self.workers = workers
+        self.classes: Dict[str, Dict[str, Any]] = {}
+        self.enums: Dict[str, Dict[str, Any]] = {}
+        self.errors: List[Tuple[str, str]] = []
+
+    def _matches(self, entry_name: str) -> bool:
+        """过滤非源文件及不匹配包名的条目"""
+        if not entry_name.endswith('.java'):
+            return False
+        if os.path.basename(entry_name) in ('package-info.java', 'module-info.java'):
+            return False
+        if self.package_glob is None:
+            return True
+        return fnmatch.fnmatchcase(_package_of(entry_name), self.package_glob)
+
+    def _iter_batches(self, archive: zipfile.ZipFile) -> Iterator[List[Tuple[str, bytes]]]:
+        """只读取中央目录建立索引，按批次读取匹配的条目"""
+        batch = []
+        for info in archive.infolist():
+            if info.is_dir() or not self._matches(info.filename):
+                continue
+            batch.append((info.filename, archive.read(info)))
+            if len(batch) >= BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _merge(self, results: List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]):
+        """合并单个文件的解析结果，同名类型以先出现的为准"""
+        for name, info, error in results:
+            if error is not None:
+                self.errors.append((name, error))
+                continue
+            for class_info in info['classes']:
+                self.classes.setdefault(class_info['name'], class_info)
+            for enum_info in info['enums']:
+                self.enums.setdefault(enum_info['name'], enum_info)
+
+    def add_archive(self, path: str) -> int:
+        """解析一个归档文件，返回处理的源文件数量"""
+        processed = 0
+        with zipfile.ZipFile(path) as archive:
+            if self.workers == 1:
+                for batch in self._iter_batches(archive):
+                    self._merge(_parse_batch(batch))
+                    processed += len(batch)
+            else:
+                # 只保留 workers * 2 个在途批次，避免整个归档及其序列化副本同时驻留内存；
+                # 按提交顺序合并，保证同名类型仍以先出现的为准
+                max_pending = 2 * (self.workers or os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    pending = deque()
+                    for batch in self._iter_batches(archive):
+                        if len(pending) >= max_pending:
+                            self._merge(pending.popleft().result())
+                        pending.append(pool.submit(_parse_batch, batch))
+                        processed += len(batch)
+                    while pending:
+                        self._merge(pending.popleft().result())
+        return processed
+
+    def get_parsed_info(self) -> Dict[str, Any]:
+        """获取合并后的解析结果，格式与 JavaEntityParser.get_parsed_info 一致"""
+        return build_parsed_info(self.classes, self.enums)
+
+
+def build_parsed_info(classes: Dict[str, Dict[str, Any]], enums: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """将按名称索引的类与枚举组合为解析结果"""
+    merged_classes = []
+    for class_info in classes.values():
+        fields = []
+        for field in class_info['fields']:
+            # 单文件解析时无法识别其他文件中定义的枚举，这里统一修正
+            if field['fieldType'] == 'custom' and field['type'] in enums:
+                field = dict(field, fieldType='enum')
+            fields.append(field)
+        merged_classes.append(dict(class_info, fields=fields))
+    return {
+        "classes": merged_classes,
+        "enums": list(enums.values())
+    }
+
+
+def load_archives(paths: List[str], package_glob: Optional[str] = None,
+                  workers: Optional[int] = None) -> Dict[str, Any]:
+    """解析多个归档文件并返回合并后的解析结果"""
+    loader = ArchiveSourceLoader(package_glob=package_glob, workers=workers)
+    for path in paths:
+        loader.add_archive(path)
+    return loader.get_parsed_info()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="解析 -sources.jar / zip 归档中的 Java 实体类")
+    arg_parser.add_argument("archives", nargs="+", help="归档文件路径")
+    arg_parser.add_argument("--package", dest="package_glob", help="包名过滤，例如 com.acme.dto.*")
+    arg_parser.add_argument("--workers", type=int, help="解析进程数，默认 CPU 数")
+    args = arg_parser.parse_args()
+
+    started = time.perf_counter()
+    source_loader = ArchiveSourceLoader(package_glob=args.package_glob, workers=args.workers)
+    total = sum(source_loader.add_archive(archive_path) for archive_path in args.archives)
+    parsed = source_loader.get_parsed_info()
+    print(json.dumps({
+        "files": total,
+        "classes": len(parsed["classes"]),
+        "enums": len(parsed["enums"]),
+        "errors": len(source_loader.errors),
+        "elapsed": round(time.perf_counter() - started, 2)
+    }, indent=2))
@@ -0,0 +1,313 @@
+import struct
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Tuple, Union
+
+from generate_json import ARRAY, COLLECTION, ENUM, MAP, OBJECT, JsonGenerator, Projection
+
+# 写入文件前在内存中累积的字节数
+FLUSH_SIZE = 1 << 16
+
+_pack_double = struct.Struct('>d').pack
+
+
+class MessagePackFormat:
+    """MessagePack 编码的基本元素"""
+    name = 'msgpack'
+    NIL = b'\xc0'
+    FALSE = b'\xc2'
+    TRUE = b'\xc3'
+
+    @staticmethod
+    def int(value: int, out: bytearray):
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -32 <= value < 0:
+            out.append(value & 0xff)
+        elif 0 <= value:
+            if value < 0x100:
+                out += b'\xcc' + value.to_bytes(1, 'big')
+            elif value < 0x10000:
+                out += b'\xcd' + value.to_bytes(2, 'big')
+            elif value < 0x100000000:
+                out += b'\xce' + value.to_bytes(4, 'big')
+            else:
+                out += b'\xcf' + value.to_bytes(8, 'big')
+        elif value >= -0x80:
+            out += b'\xd0' + value.to_bytes(1, 'big', signed=True)
+        elif value >= -0x8000:
+            out += b'\xd1' + value.to_bytes(2, 'big', signed=True)
+        elif value >= -0x80000000:
+            out += b'\xd2' + value.to_bytes(4, 'big', signed=True)
+        else:
+            out += b'\xd3' + value.to_bytes(8, 'big', signed=True)
+
+    @staticmethod
+    def float(value: float, out: bytearray):
+        out += b'\xcb' + _pack_double(value)
+
+    @staticmethod
+    def str(value: str, out: bytearray):
+        data = value.encode('utf-8')
+        size = len(data)
+        if size < 32:
+            out.append(0xa0 | size)
+        elif size < 0x100:
+            out += b'\xd9' + size.to_bytes(1, 'big')
+        elif size < 0x10000:
+            out += b'\xda' + size.to_bytes(2, 'big')
+        else:
+            out += b'\xdb' + size.to_bytes(4, 'big')
+        out += data
+
+    @staticmethod
+    def array_header(size: int, out: bytearray):
+        if size < 16:
+            out.append(0x90 | size)
+        elif size < 0x10000:
+            out += b'\xdc' + size.to_bytes(2, 'big')
+        else:
+            out += b'\xdd' + size.to_bytes(4, 'big')
+
+    @staticmethod
+    def map_header(size: int, out: bytearray):
+        if size < 16:
+            out.append(0x80 | size)
+        elif size < 0x10000:
+            out += b'\xde' + size.to_bytes(2, 'big')
+        else:
+            out += b'\xdf' + size.to_bytes(4, 'big')
+
+
+def _cbor_header(major: int, value: int, out: bytearray):
+    """CBOR 头部：主类型 + 长度/数值"""
+    major <<= 5
+    if value < 24:
+        out.append(major | value)
+    elif value < 0x100:
+        out.append(major | 24)
+        out.append(value)
+    elif value < 0x10000:
+        out.append(major | 25)
+        out += value.to_bytes(2, 'big')
+    elif value < 0x100000000:
+        out.append(major | 26)
+        out += value.to_bytes(4, 'big')
+    else:
+        out.append(major | 27)
+        out += value.to_bytes(8, 'big')
+
+
+class CborFormat:
+    """CBOR（RFC 8949）编码的基本元素"""
+    name = 'cbor'
+    NIL = b'\xf6'
+    FALSE = b'\xf4'
+    TRUE = b'\xf5'
+
+    @staticmethod
+    def int(value: int, out: bytearray):
+        if value >= 0:
+            _cbor_header(0, value, out)
+        else:
+            _cbor_header(1, -1 - value, out)
+
+    @staticmethod
+    def float(value: float, out: bytearray):
+        out += b'\xfb' + _pack_double(value)
+
+    @staticmethod
+    def str(value: str, out: bytearray):
+        data = value.encode('utf-8')
+        _cbor_header(3, len(data), out)
+        out += data
+
+    @staticmethod
+    def array_header(size: int, out: bytearray):
+        _cbor_header(4, size, out)
+
+    @staticmethod
+    def map_header(size: int, out: bytearray):
+        _cbor_header(5, size, out)
+
+
+FORMATS = {
+    'msgpack': MessagePackFormat,
+    'cbor': CborFormat
+}
+
+
+class PlanEncoder:
+    """按生成器的类计划编码记录：每个类的 Map 头、字段名和枚举字符串只编码一次"""
+
+    def __init__(self, generator: JsonGenerator, fmt: str = 'msgpack'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+        self.format = FORMATS[fmt]
+        self.plans = generator.plans
+        # 类名 -> (字段名集合, Map 头, ((字段名, 键字节, 节点), ...))
+        self.classes: Dict[str, Tuple[frozenset, bytes, tuple]] = {}
+        self.enums: Dict[tuple, Dict[str, bytes]] = {}
+        for class_name in self.plans:
+            self._compile_class(class_name)
+
+    def _encoded(self, value: Any) -> bytes:
+        out = bytearray()
+        self.encode_value(value, out)
+        return bytes(out)
+
+    def _compile_node(self, node: tuple):
+        """预编码节点中的枚举值"""
+        while node is not None:
+            kind = node[0]
+            if kind == ENUM and node not in self.enums:
+                self.enums[node] = {value: self._encoded(value) for value in node[1]}
+            if kind in (COLLECTION, ARRAY):
+                node = node[1]
+            elif kind == MAP:
+                node = node[2]
+            else:
+                node = None
+
+    def _compile_class(self, class_name: str):
+        fields = []
+        for field_name, node in self.plans[class_name]:
+            fields.append((field_name, self._encoded(field_name), node))
+            self._compile_node(node)
+        header = bytearray()
+        self.format.map_header(len(fields), header)
+        self.classes[class_name] = (frozenset(name for name, _, _ in fields), bytes(header), tuple(fields))
+
+    def encode_value(self, value: Any, out: bytearray):
+        """不依赖计划的通用编码"""
+        self.encode(value, None, out)
+
+    def encode(self, value: Any, node: Optional[tuple], out: bytearray):
+        """按节点编码值；值与计划不一致（例如被截断的循环对象）时退回通用编码"""
+        fmt = self.format
+        stack = [(value, node)]
+        while stack:
+            item = stack.pop()
+            if item.__class__ is bytes:
+                out += item
+                continue
+            value, node = item
+            kind = node[0] if node is not None else None
+            value_type = value.__class__
+
+            if kind == OBJECT and value_type is dict:
+                field_names, header, fields = self.classes[node[1]]
+                if value.keys() == field_names:
+                    out += header
+                    for index in range(len(fields) - 1, -1, -1):
+                        field_name, key_bytes, field_node = fields[index]
+                        stack.append((value[field_name], field_node))
+                        stack.append(key_bytes)
+                    continue
+            elif kind == ENUM:
+                encoded = self.enums[node].get(value)
+                if encoded is not None:
+                    out += encoded
+                    continue
+            elif (kind == COLLECTION or kind == ARRAY) and value_type is list:
+                fmt.array_header(len(value), out)
+                element = node[1]
+                for index in range(len(value) - 1, -1, -1):
+                    stack.append((value[index], element))
+                continue
+            elif kind == MAP and value_type is dict:
+                fmt.map_header(len(value), out)
+                element = node[2]
+                for key, item_value in reversed(list(value.items())):
+                    stack.append((item_value, element))
+                    stack.append((key, None))
+                continue
+
+            # 通用编码
+            if value_type is str:
+                fmt.str(value, out)
+            elif value_type is int:
+                fmt.int(value, out)
+            elif value is None:
+                out += fmt.NIL
+            elif value_type is bool:
+                out += fmt.TRUE if value else fmt.FALSE
+            elif value_type is float:
+                fmt.float(value, out)
+            elif value_type is list or value_type is tuple:
+                fmt.array_header(len(value), out)
+                for index in range(len(value) - 1, -1, -1):
+                    stack.append((value[index], None))
+            elif value_type is dict:
+                fmt.map_header(len(value), out)
+                for key, item_value in reversed(list(value.items())):
+                    stack.append((item_value, None))
+                    stack.append((str(key), None))
+            else:
+                raise TypeError(f"Cannot encode {value_type.__name__}")
+
+    def encode_record(self, record: Dict[str, Any], class_name: str) -> bytes:
+        out = bytearray()
+        self.encode(record, (OBJECT, class_name), out)
+        return bytes(out)
+
+
+def write_records(generator: JsonGenerator, fp: BinaryIO, fmt: str = 'msgpack',
+                  class_name: Optional[str] = None, count: int = 1,
+                  projection: Union[Projection, Iterable[str], None] = None) -> int:
+    """生成 count 条记录并以 MessagePack / CBOR 序列写入文件，返回写入的字节数"""
+    class_name = generator.resolve_class_name(class_name)
+    if class_name is None:
+        raise ValueError("No class to generate")
+    encoder = PlanEncoder(generator, fmt)
+    root = (OBJECT, class_name)
+    out = bytearray()
+    written = 0
+    for _ in range(count):
+        encoder.encode(generator.generate_example(class_name, projection=projection), root, out)
+        if len(out) >= FLUSH_SIZE:
+            fp.write(out)
+            written += len(out)
+            out.clear()
+    fp.write(out)
+    return written + len(out)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    from parse_java import JavaEntityParser
+
+    arg_parser = argparse.ArgumentParser(description="比较 JSON / MessagePack / CBOR 的大小与编码吞吐量")
+    arg_parser.add_argument("source", help="Java 源文件路径")
+    arg_parser.add_argument("--class", dest="class_name", help="要生成的类名，默认第一个类")
+    arg_parser.add_argument("--count", type=int, default=20000, help="记录数")
+    arg_parser.add_argument("--collection-size", type=int, default=3, help="集合元素个数")
+    args = arg_parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        info = JavaEntityParser(f.read()).get_parsed_info()
+    bench_generator = JsonGenerator(info, collection_size=args.collection_size, map_size=args.collection_size)
+    target = bench_generator.resolve_class_name(args.class_name)
+    records = [bench_generator.generate_example(target) for _ in range(args.count)]
+
+    def bench_json() -> int:
+        return sum(len((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")) for record in records)
+
+    def bench_binary(fmt: str):
+        encoder = PlanEncoder(bench_generator, fmt)
+        root_node = (OBJECT, target)
+        buffer = bytearray()
+        for record in records:
+            encoder.encode(record, root_node, buffer)
+        return len(buffer)
+
+    print(f"{'format':<10}{'bytes':>14}{'ratio':>8}{'records/s':>14}")
+    baseline = None
+    for label, run in (("json", bench_json), ("msgpack", lambda: bench_binary("msgpack")),
+                       ("cbor", lambda: bench_binary("cbor"))):
+        started = time.perf_counter()
+        size = run()
+        elapsed = time.perf_counter() - started
+        baseline = baseline or size
+        print(f"{label:<10}{size:>14,}{size / baseline:>8.2f}{args.count / elapsed:>14,.0f}")
@@ -0,0 +1,245 @@
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from generate_json import (ARRAY, COLLECTION, ENUM, MAP, MAP_KEY_TYPES, OBJECT, PRIMITIVE, UNIQUE,
+                           JsonGenerator, dumps_json)
+
+# 基本类型在紧凑 JSON 中的 (期望, 最大) 字节数
+PRIMITIVE_JSON_SIZES = {
+    'String': (10, 10),
+    'Integer': (1.92, 3), 'int': (1.92, 3),
+    'Long': (4, 4), 'long': (4, 4), 'BigInteger': (4, 4),
+    'Double': (4.9, 5), 'double': (4.9, 5), 'Float': (4.9, 5), 'float': (4.9, 5),
+    'BigDecimal': (7.9, 8),
+    'Boolean': (4.5, 5), 'boolean': (4.5, 5),
+    'Date': (12, 12), 'LocalDate': (12, 12), 'LocalDateTime': (21, 21),
+    'byte': (2.9, 4), 'Byte': (2.9, 4),
+    'short': (5.4, 6), 'Short': (5.4, 6),
+    'char': (3, 3), 'Character': (3, 3)
+}
+
+# Map 键的取值空间大小及 (期望, 最大) 字节数（含引号）
+MAP_KEY_DOMAINS = {
+    'String': (52 ** 8, 10, 10),
+    'Integer': (100, 3.92, 5),
+    'Long': (9000, 6, 6)
+}
+
+# 内存中每个生成值的大致开销（dict/list/str/int 对象及容器槽位）
+MEMORY_PER_VALUE = 120
+
+# 流式生成时 gzip 输出与原始 JSON 的大致字节比例，压缩结果仍需放在内存中供下载
+GZIP_RATIO = 0.6
+
+# 校准时允许的最大样本规模
+CALIBRATION_MAX_VALUES = 200_000
+
+# 成本: (期望值个数, 最大值个数, 期望字节数, 最大字节数)
+Cost = Tuple[float, float, float, float]
+EMPTY_COST: Cost = (1, 1, 2, 2)
+
+
+@dataclass
+class OutputEstimate:
+    expected_values: int
+    max_values: int
+    expected_bytes: int
+    max_bytes: int
+    expected_seconds: float
+    max_seconds: float
+    memory_bytes: int
+    calibrated: bool = False
+
+    def scaled(self, count: int) -> 'OutputEstimate':
+        """生成 count 条记录时的预估"""
+        return OutputEstimate(
+            expected_values=self.expected_values * count,
+            max_values=self.max_values * count,
+            expected_bytes=self.expected_bytes * count,
+            max_bytes=self.max_bytes * count,
+            expected_seconds=self.expected_seconds * count,
+            max_seconds=self.max_seconds * count,
+            memory_bytes=self.memory_bytes * count,
+            calibrated=self.calibrated
+        )
+
+
+@dataclass
+class GenerationLimits:
+    max_memory_bytes: int = 256 * 1024 * 1024
+    max_output_bytes: Optional[int] = 2 * 1024 * 1024 * 1024
+    allow_streaming: bool = True
+
+
+class OutputTooLargeError(ValueError):
+    """预估输出超过限制"""
+
+
+class OutputEstimator:
+    """在生成之前基于类型图和集合大小估算输出规模"""
+
+    def __init__(self, generator: JsonGenerator):
+        self.generator = generator
+        self.memo: Dict[Tuple[str, tuple], Cost] = {}
+
+    def _object_key(self, class_name: str, path: tuple) -> Optional[Tuple[str, tuple]]:
+        """与生成器相同的循环截断规则，被截断时返回 None"""
+        limit = self.generator.cycle_limits.get(class_name)
+        if limit is None:
+            return class_name, path
+        if path.count(class_name) >= limit:
+            return None
+        return class_name, path + (class_name,)
+
+    def _map_keys(self, key_type: Optional[str]) -> Tuple[float, float, float, float]:
+        """返回 Map 的 (期望键数, 最大键数, 每个键期望字节数, 每个键最大字节数)"""
+        size = self.generator.map_size
+        if key_type in MAP_KEY_TYPES:
+            domain, expected_bytes, max_bytes = MAP_KEY_DOMAINS[key_type]
+            # 随机键会重复，期望的不同键个数为 D * (1 - (1 - 1/D)^n)
+            expected = domain * (1 - (1 - 1 / domain) ** size)
+            return expected, min(size, domain), expected_bytes, max_bytes
+        key_bytes = len(f'"key{max(size - 1, 0)}"')
+        return size, size, key_bytes, key_bytes
+
+    def _node_cost(self, node: tuple, path: tuple, missing: List[Tuple[str, tuple]]) -> Optional[Cost]:
+        """计算节点成本，依赖的类尚未计算时记录到 missing 并返回 None"""
+        kind = node[0]
+        if kind == PRIMITIVE or kind == UNIQUE:
+            expected, maximum = PRIMITIVE_JSON_SIZES.get(node[-1], (10, 10))
+            return 1, 1, expected, maximum
+        if kind == ENUM:
+            if not node[1]:
+                return 1, 1, 4, 4
+            lengths = [len(value) + 2 for value in node[1]]
+            return 1, 1, sum(lengths) / len(lengths), max(lengths)
+        if kind == OBJECT:
+            key = self._object_key(node[1], path)
+            if key is None:
+                return EMPTY_COST
+            cost = self.memo.get(key)
+            if cost is None:
+                missing.append(key)
+            return cost
+        if kind == COLLECTION or kind == ARRAY:
+            element = self._node_cost(node[1], path, missing)
+            if element is None:
+                return None
+            size = self.generator.collection_size
+            separators = 2 * max(size - 1, 0)
+            return (1 + size * element[0], 1 + size * element[1],
+                    2 + size * element[2] + separators, 2 + size * element[3] + separators)
+        if kind == MAP:
+            value = self._node_cost(node[2], path, missing)
+            if value is None:
+                return None
+            expected_keys, max_keys, expected_key_bytes, max_key_bytes = self._map_keys(node[1])
+            return (1 + expected_keys * value[0], 1 + max_keys * value[1],
+                    2 + expected_keys * (expected_key_bytes + 2 + value[2]) + 2 * max(expected_keys - 1, 0),
+                    2 + max_keys * (max_key_bytes + 2 + value[3]) + 2 * max(max_keys - 1, 0))
+        return EMPTY_COST
+
+    def _class_cost(self, class_name: str, path: tuple, missing: List[Tuple[str, tuple]]) -> Cost:
+        plan = self.generator.plans[class_name]
+        values, max_values = 1.0, 1.0
+        expected_bytes = max_bytes = 2.0 + 2 * max(len(plan) - 1, 0)
+        for field_name, node in plan:
+            cost = self._node_cost(node, path, missing)
+            if cost is None:
+                continue
+            key_bytes = len(json.dumps(field_name, ensure_ascii=False)) + 2
+            values += cost[0]
+            max_values += cost[1]
+            expected_bytes += key_bytes + cost[2]
+            max_bytes += key_bytes + cost[3]
+        return values, max_values, expected_bytes, max_bytes
+
+    def cost(self, class_name: str) -> Cost:
+        """计算根类的成本，使用显式栈按依赖顺序求值"""
+        root = self._object_key(class_name, ())
+        stack = [root]
+        while stack:
+            key = stack[-1]
+            if key in self.memo:
+                stack.pop()
+                continue
+            missing: List[Tuple[str, tuple]] = []
+            cost = self._class_cost(key[0], key[1], missing)
+            if missing:
+                stack.extend(missing)
+                continue
+            self.memo[key] = cost
+            stack.pop()
+        return self.memo[root]
+
+
+def _calibrate(generator: JsonGenerator, class_name: str, sample_seconds: float) -> Tuple[float, float]:
+    """用小规模样本实测每个值的生成耗时以及实际/估算字节比例"""
+    # 试生成不能消耗真实的唯一值
+    sample = generator.with_fresh_allocators().with_sizes(min(generator.collection_size, 1),
+                                                          min(generator.map_size, 1))
+    sample_cost = OutputEstimator(sample).cost(class_name)
+    if sample_cost[1] > CALIBRATION_MAX_VALUES:
+        return 0.0, 1.0
+    runs = 0
+    total_bytes = 0
+    started = time.perf_counter()
+    while True:
+        total_bytes += len(dumps_json(sample.generate_example(class_name)))
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= sample_seconds or runs >= 1000:
+            break
+    seconds_per_value = elapsed / (runs * sample_cost[0])
+    byte_ratio = total_bytes / (runs * sample_cost[2]) if sample_cost[2] else 1.0
+    return seconds_per_value, byte_ratio
+
+
+def estimate_output(generator: JsonGenerator, class_name: Optional[str] = None,
+                    calibrate: bool = True, sample_seconds: float = 0.05) -> OutputEstimate:
+    """估算生成指定类所需的值个数、字节数、耗时与内存"""
+    class_name = generator.resolve_class_name(class_name)
+    if class_name is None:
+        return OutputEstimate(1, 1, 2, 2, 0.0, 0.0, MEMORY_PER_VALUE)
+
+    values, max_values, expected_bytes, max_bytes = OutputEstimator(generator).cost(class_name)
+    seconds_per_value, byte_ratio = 0.0, 1.0
+    if calibrate:
+        seconds_per_value, byte_ratio = _calibrate(generator, class_name, sample_seconds)
+    return OutputEstimate(
+        expected_values=round(values),
+        max_values=round(max_values),
+        expected_bytes=round(expected_bytes * byte_ratio),
+        max_bytes=round(max_bytes * max(byte_ratio, 1.0)),
+        expected_seconds=values * seconds_per_value,
+        max_seconds=max_values * seconds_per_value,
+        # 完整对象树加上序列化后的字符串
+        memory_bytes=round(max_values * MEMORY_PER_VALUE + max_bytes * 2),
+        calibrated=seconds_per_value > 0
+    )
+
+
+def choose_mode(estimate: OutputEstimate, limits: GenerationLimits) -> str:
+    """根据限制选择生成方式：内存中生成（memory）或流式生成（stream）"""
+    if limits.max_output_bytes is not None and estimate.max_bytes > limits.max_output_bytes:
+        raise OutputTooLargeError(
+            f"Estimated output of {estimate.max_bytes} bytes exceeds the limit of {limits.max_output_bytes} bytes")
+    if estimate.memory_bytes <= limits.max_memory_bytes:
+        return 'memory'
+    if limits.allow_streaming:
+        if estimate.max_bytes * GZIP_RATIO > limits.max_memory_bytes:
+            raise OutputTooLargeError(
+                f"Estimated compressed output of {round(estimate.max_bytes * GZIP_RATIO)} bytes exceeds "
+                f"the memory limit of {limits.max_memory_bytes} bytes")
+        return 'stream'
+    raise OutputTooLargeError(
+        f"Estimated memory of {estimate.memory_bytes} bytes exceeds the limit of {limits.max_memory_bytes} bytes")
+
+
+def plan_generation(generator: JsonGenerator, class_name: Optional[str] = None,
+                    limits: Optional[GenerationLimits] = None) -> Tuple[OutputEstimate, str]:
+    """估算输出规模并确定生成方式，超出限制时抛出 OutputTooLargeError"""
+    estimate = estimate_output(generator, class_name)
+    return estimate, choose_mode(estimate, limits or GenerationLimits())
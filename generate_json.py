@@ -1,19 +1,254 @@
+import copy
+import hashlib
 import json
 import random
 import string
+import zlib
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from allocators import create_allocator, mix64
+from subtree_cache import SubtreeCache
+
+COLLECTION_TYPES = {'List', 'Set', 'Collection', 'ArrayList', 'HashSet', 'LinkedList', 'TreeSet'}
+MAP_TYPES = {'Map', 'HashMap', 'TreeMap', 'LinkedHashMap', 'ConcurrentHashMap'}
+MAP_KEY_TYPES = {'String', 'Integer', 'Long'}
+
+# 基本类型的示例值生成函数，参数为随机数生成器
+PRIMITIVE_GENERATORS = {
+    'String': lambda rng: ''.join(rng.choices(string.ascii_letters, k=8)),
+    'Integer': lambda rng: rng.randint(1, 100),
+    'int': lambda rng: rng.randint(1, 100),
+    'Long': lambda rng: rng.randint(1000, 9999),
+    'long': lambda rng: rng.randint(1000, 9999),
+    'BigInteger': lambda rng: rng.randint(1000, 9999),
+    'Double': lambda rng: round(rng.uniform(1.0, 100.0), 2),
+    'double': lambda rng: round(rng.uniform(1.0, 100.0), 2),
+    'Float': lambda rng: round(rng.uniform(1.0, 100.0), 2),
+    'float': lambda rng: round(rng.uniform(1.0, 100.0), 2),
+    'Boolean': lambda rng: rng.choice([True, False]),
+    'boolean': lambda rng: rng.choice([True, False]),
+    'BigDecimal': lambda rng: str(round(rng.uniform(1.0, 1000.0), 2)),
+    'Date': lambda rng: datetime.now().strftime("%Y-%m-%d"),
+    'LocalDate': lambda rng: datetime.now().strftime("%Y-%m-%d"),
+    'LocalDateTime': lambda rng: datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    'byte': lambda rng: rng.randint(-128, 127),
+    'Byte': lambda rng: rng.randint(-128, 127),
+    'short': lambda rng: rng.randint(-32768, 32767),
+    'Short': lambda rng: rng.randint(-32768, 32767),
+    'char': lambda rng: rng.choice(string.ascii_letters),
+    'Character': lambda rng: rng.choice(string.ascii_letters)
+}
+
+# 编译后的类型节点种类，节点为 (种类, ...) 元组
+PRIMITIVE = 0   # (PRIMITIVE, 类型名)
+ENUM = 1        # (ENUM, 枚举值元组)
+OBJECT = 2      # (OBJECT, 类名) 或 (OBJECT, 类名, 投影后的字段计划, 字段种子盐)
+COLLECTION = 3  # (COLLECTION, 元素节点)
+MAP = 4         # (MAP, 键类型, 值节点)
+ARRAY = 5       # (ARRAY, 元素节点)
+EMPTY = 6       # (EMPTY, list 或 dict)，无法展开的类型
+UNIQUE = 7      # (UNIQUE, 分配器键, 类型名)，@Id 或配置为唯一的字段
+_STORE = -1     # (_STORE, 缓存键, 唯一字段, 进入子树时的序号)，仅在生成过程中使用：子树完成后写入缓存
+
+# 需要派生独立种子的节点种类
+_SEEDED_KINDS = (OBJECT, COLLECTION, ARRAY, MAP)
+
+# 子树缓存的边界：只缓存根对象及其下 CACHE_DEPTH 层内的对象，
+# 避免同一子树在每一层祖先中都被重复序列化和存储
+CACHE_DEPTH = 1
+
+# 生成过程中每处理这么多个节点回调一次进度（须为 2 的幂）
+PROGRESS_INTERVAL = 1 << 12
+
+
+@dataclass
+class Projection:
+    """字段投影：include 为空时保留所有字段，exclude 中的路径总是被去掉"""
+    include: Optional[List[str]] = None
+    exclude: List[str] = field(default_factory=list)
+
+
+def parse_projection_path(path: str) -> Tuple[str, ...]:
+    """
+    解析投影路径，支持点号和 JSONPath 风格，如 "orders[].status"、"$.orders[*].status"。
+    集合、数组和 Map 的元素层级是透明的，"[]"、"[*]" 和 "*" 可以省略。
+    """
+    path = path.strip()
+    if path.startswith('$'):
+        path = path[1:]
+    path = path.replace('[*]', '.').replace('[]', '.')
+    segments = tuple(segment for segment in path.split('.') if segment and segment != '*')
+    if not segments:
+        raise ValueError(f"Empty projection path: {path!r}")
+    return segments
+
+
+def _path_trie(paths: Iterable[str]) -> Dict[str, Any]:
+    """将路径列表构建为前缀树，叶子为 None 表示整个子树"""
+    trie: Dict[str, Any] = {}
+    for path in paths:
+        node = trie
+        segments = parse_projection_path(path)
+        for segment in segments[:-1]:
+            child = node.get(segment, {})
+            if child is None:  # 已包含整个子树
+                break
+            node = node.setdefault(segment, child)
+        else:
+            node[segments[-1]] = None
+    return trie
+
+
+def _strongly_connected_components(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """Tarjan 算法（非递归）求强连通分量"""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components = []
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph[succ])))
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def _json_key(key: Any) -> str:
+    """与 json.dumps 相同的键转换规则"""
+    if key.__class__ is str:
+        return key
+    if key is True or key is False or key is None:
+        return json.dumps(key)
+    return str(key)
+
+
+def dumps_json(value: Any, indent: Optional[int] = None,
+               separators: Optional[Tuple[str, str]] = None) -> str:
+    """
+    与 json.dumps(value, indent=indent, separators=separators, ensure_ascii=False) 输出一致，
+    但使用显式栈，不受嵌套深度和递归限制的影响
+    """
+    if separators is None:
+        separators = (', ', ': ') if indent is None else (',', ': ')
+    item_separator, key_separator = separators
+    dumps = json.dumps
+    parts: List[str] = []
+    # 栈帧: 字符串为待输出的文本；(值, 深度) 为待序列化的值
+    stack: List[Any] = [(value, 0)]
+    while stack:
+        frame = stack.pop()
+        if frame.__class__ is str:
+            parts.append(frame)
+            continue
+        value, depth = frame
+        value_type = value.__class__
+        if value_type is dict or value_type is list or value_type is tuple:
+            if not value:
+                parts.append('{}' if value_type is dict else '[]')
+                continue
+            if indent is None:
+                inner = outer = ''
+                separator = item_separator
+            else:
+                inner = '\n' + ' ' * (indent * (depth + 1))
+                outer = '\n' + ' ' * (indent * depth)
+                separator = item_separator + inner
+            if value_type is dict:
+                parts.append('{' + inner)
+                stack.append(outer + '}')
+                items = list(value.items())
+                for index in range(len(items) - 1, -1, -1):
+                    item_key, item_value = items[index]
+                    stack.append((item_value, depth + 1))
+                    stack.append((separator if index else '')
+                                 + dumps(_json_key(item_key), ensure_ascii=False) + key_separator)
+            else:
+                parts.append('[' + inner)
+                stack.append(outer + ']')
+                for index in range(len(value) - 1, -1, -1):
+                    stack.append((value[index], depth + 1))
+                    if index:
+                        stack.append(separator)
+        else:
+            parts.append(dumps(value, ensure_ascii=False))
+    return ''.join(parts)
 
 
 class JsonGenerator:
-    def __init__(self, parsed_info: Dict[str, Any]):
+    def __init__(self, parsed_info: Dict[str, Any], max_cycle_depth: int = 1,
+                 cycle_depths: Optional[Dict[str, int]] = None,
+                 collection_size: int = 1, map_size: int = 1,
+                 unique_fields: Optional[Iterable[str]] = None, id_strategy: str = 'sequence',
+                 id_seed: int = 0, shard: int = 0, shard_count: int = 1,
+                 cache: Optional[SubtreeCache] = None):
+        """
+        max_cycle_depth: 循环引用中同一个类在一条路径上最多出现的次数
+        cycle_depths: 按类名覆盖所在循环的最大深度
+        collection_size: 集合与数组的元素个数
+        map_size: Map 的键值对个数
+        unique_fields: 需要唯一值的字段，格式为 "类名.字段名" 或 "字段名"；@Id 字段总是唯一
+        id_strategy: 唯一数值的分配方式，sequence（递增序列）或 permutation（区间置换）
+        id_seed: 置换分配器的种子，与 generate_example 的 seed 无关
+        shard, shard_count: 并行生成时的分片编号与分片总数，各分片分配的值互不重复
+        cache: 子树缓存，仅在按种子生成时使用
+        """
+        if collection_size < 0 or map_size < 0:
+            raise ValueError("collection_size and map_size must not be negative")
         self.parsed_info = parsed_info
+        self.collection_size = collection_size
+        self.map_size = map_size
+        self.unique_fields = set(unique_fields or ())
+        self.id_strategy = id_strategy
+        self.id_seed = id_seed
+        self.shard = shard
+        self.shard_count = shard_count
+        self.cache = cache
+        self.allocators: Dict[str, Any] = {}
         self.enum_values = self._build_enum_values()
-        self.processed_classes = set()  # 防止循环引用
-
-    def _generate_array(self, type_name: str, size: int = 1) -> List[Any]:
-        """生成数组类型的示例值"""
-        return [self._generate_value_by_type(type_name) for _ in range(size)]
+        self.classes = {cls['name']: cls for cls in parsed_info['classes']}
+        self.plans: Dict[str, Tuple[Tuple[str, tuple], ...]] = {
+            name: self._compile_class(class_info) for name, class_info in self.classes.items()
+        }
+        self.cycle_limits = self._analyze_cycles(max_cycle_depth, cycle_depths or {})
+        # 每个字段派生子种子用的盐，按字段名计算，投影后的计划与完整计划一致
+        self.field_salts: Dict[str, Tuple[int, ...]] = {
+            name: tuple(zlib.crc32(field_name.encode('utf-8')) for field_name, _ in plan)
+            for name, plan in self.plans.items()
+        }
+        self._subtree_hashes: Dict[str, str] = {}
+        self._subtree_unique_keys: Dict[str, Tuple[str, ...]] = {}
+        self._projections: Dict[tuple, tuple] = {}
 
     def _build_enum_values(self) -> Dict[str, List[str]]:
         """构建枚举类型到枚举值的映射"""
@@ -24,159 +259,443 @@ class JsonGenerator:
             ]
         return enum_values
 
-    def _generate_primitive(self, type_name: str) -> Any:
-        """生成基本类型的示例值"""
-        type_generators = {
-            'String': lambda: ''.join(random.choices(string.ascii_letters, k=8)),
-            'Integer': lambda: random.randint(1, 100),
-            'int': lambda: random.randint(1, 100),
-            'Long': lambda: random.randint(1000, 9999),
-            'long': lambda: random.randint(1000, 9999),
-            'Double': lambda: round(random.uniform(1.0, 100.0), 2),
-            'double': lambda: round(random.uniform(1.0, 100.0), 2),
-            'Float': lambda: round(random.uniform(1.0, 100.0), 2),
-            'float': lambda: round(random.uniform(1.0, 100.0), 2),
-            'Boolean': lambda: random.choice([True, False]),
-            'boolean': lambda: random.choice([True, False]),
-            'BigDecimal': lambda: str(round(random.uniform(1.0, 1000.0), 2)),
-            'Date': lambda: datetime.now().strftime("%Y-%m-%d"),
-            'LocalDate': lambda: datetime.now().strftime("%Y-%m-%d"),
-            'LocalDateTime': lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'byte': lambda: random.randint(-128, 127),
-            'Byte': lambda: random.randint(-128, 127),
-            'short': lambda: random.randint(-32768, 32767),
-            'char': lambda: random.choice(string.ascii_letters),
-            'Character': lambda: random.choice(string.ascii_letters)
-        }
-
-        return type_generators.get(type_name, lambda: f"Unknown type: {type_name}")()
-
-    def _generate_collection(self, generic_info: Dict[str, Any], size: int = 1) -> List[Any]:
-        """生成集合类型的示例值"""
-        result = []
-        if not generic_info['typeArguments']:
-            return result
-
-        type_arg = generic_info['typeArguments'][0]
-        for _ in range(size):
-            if isinstance(type_arg, dict):  # 嵌套的泛型类型
-                result.append(self._generate_value_by_generic_info(type_arg))
-            else:  # 简单类型
-                result.append(self._generate_value_by_type(type_arg))
-
-        return result
-
-    def _generate_map(self, generic_info: Dict[str, Any], size: int = 1) -> Dict[str, Any]:
-        """生成Map类型的示例值"""
-        result = {}
-        if len(generic_info['typeArguments']) < 2:
-            return result
-
-        key_type = generic_info['typeArguments'][0]
-        value_type = generic_info['typeArguments'][1]
-
-        for i in range(size):
-            key = (self._generate_primitive(key_type)
-                   if key_type in ['String', 'Integer', 'Long']
-                   else f"key{i}")
-
-            if isinstance(value_type, dict):  # 嵌套的泛型类型
-                value = self._generate_value_by_generic_info(value_type)
-            else:  # 简单类型
-                value = self._generate_value_by_type(value_type)
-
-            result[str(key)] = value
-
-        return result
-
-    def _generate_value_by_generic_info(self, generic_info: Dict[str, Any]) -> Any:
-        """根据泛型信息生成值"""
-        raw_type = generic_info['rawType']
-
-        if raw_type in ['List', 'Set', 'Collection', 'ArrayList', 'HashSet']:
-            return self._generate_collection(generic_info)
-        elif raw_type in ['Map', 'HashMap', 'TreeMap', 'LinkedHashMap']:
-            return self._generate_map(generic_info)
-        else:
-            return self._generate_value_by_type(raw_type)
-
-    def _generate_value_by_type(self, type_name: str) -> Any:
-        """根据类型生成值"""
-        # 处理数组类型 (检查是否以[]结尾)
+    def _compile_type(self, type_name: str) -> tuple:
+        """将类型名编译为节点"""
         if type_name.endswith('[]'):
-            base_type = type_name[:-2]
-            return self._generate_array(base_type)
-
-        # 处理基本类型
-        if type_name in ['String', 'Integer', 'int', 'Long', 'long', 'Double',
-                         'double', 'Float', 'float', 'Boolean', 'boolean',
-                         'BigDecimal', 'Date', 'LocalDate', 'LocalDateTime', 'byte', 'Byte', 'short', 'char',
-                         'Character']:
-            return self._generate_primitive(type_name)
-
-        # 处理枚举类型
+            return ARRAY, self._compile_type(type_name[:-2])
+        if type_name in PRIMITIVE_GENERATORS:
+            return PRIMITIVE, type_name
         if type_name in self.enum_values:
-            return random.choice(self.enum_values[type_name])
-
-        # 处理自定义类型
-        return self._generate_object(type_name)
-
-    def _find_class_info(self, class_name: str) -> Optional[Dict[str, Any]]:
-        """查找类信息"""
-        for class_info in self.parsed_info['classes']:
-            if class_info['name'] == class_name:
-                return class_info
-        return None
-
-    def _generate_object(self, class_name: str) -> Dict[str, Any]:
-        """生成自定义类型的示例值"""
-        if class_name in self.processed_classes:
-            return {}
-
-        self.processed_classes.add(class_name)
-        result = {}
-        class_info = self._find_class_info(class_name)
-
-        if not class_info:
-            return {}
+            return ENUM, tuple(self.enum_values[type_name])
+        if type_name in self.classes:
+            return OBJECT, type_name
+        return EMPTY, dict
 
+    def _compile_generic(self, generic_info: Dict[str, Any]) -> tuple:
+        """将泛型信息编译为节点"""
+        raw_type = generic_info['rawType']
+        type_arguments = generic_info['typeArguments']
+
+        if raw_type in COLLECTION_TYPES:
+            if not type_arguments:
+                return EMPTY, list
+            return COLLECTION, self._compile_argument(type_arguments[0])
+        if raw_type in MAP_TYPES:
+            if len(type_arguments) < 2:
+                return EMPTY, dict
+            key_type = type_arguments[0] if isinstance(type_arguments[0], str) else None
+            return MAP, key_type, self._compile_argument(type_arguments[1])
+        return self._compile_type(raw_type)
+
+    def _compile_argument(self, type_argument: Any) -> tuple:
+        if isinstance(type_argument, dict):  # 嵌套的泛型类型
+            return self._compile_generic(type_argument)
+        return self._compile_type(type_argument)
+
+    def _is_unique(self, class_name: str, field: Dict[str, Any]) -> bool:
+        """字段是否需要唯一值"""
+        if any(ann['name'] == 'Id' for ann in field.get('annotations') or []):
+            return True
+        return field['name'] in self.unique_fields or f"{class_name}.{field['name']}" in self.unique_fields
+
+    def _compile_unique(self, class_name: str, field: Dict[str, Any]) -> Optional[tuple]:
+        """为唯一字段创建分配器，类型不支持时返回 None"""
+        key = f"{class_name}.{field['name']}"
+        # 种子按字段派生，保证不同字段的置换不同且在各进程中一致
+        allocator = create_allocator(field['type'], self.id_strategy,
+                                     seed=self.id_seed ^ zlib.crc32(key.encode('utf-8')),
+                                     shard=self.shard, shard_count=self.shard_count)
+        if allocator is None:
+            return None
+        self.allocators[key] = allocator
+        return UNIQUE, key, field['type']
+
+    def _compile_class(self, class_info: Dict[str, Any]) -> Tuple[Tuple[str, tuple], ...]:
+        """将类的字段编译为 (字段名, 节点) 列表"""
+        plan = []
         for field in class_info['fields']:
-            field_name = field['name']
-            field_type = field['type']
-
-            # 处理数组类型
-            if field.get('isArray', False):
-                result[field_name] = self._generate_array(field_type)
-                continue
-
-            # 处理带泛型的类型
-            if 'genericInfo' in field:
-                result[field_name] = self._generate_value_by_generic_info(field['genericInfo'])
+            unique_node = None
+            if not field.get('isArray', False) and 'genericInfo' not in field \
+                    and self._is_unique(class_info['name'], field):
+                unique_node = self._compile_unique(class_info['name'], field)
+            if unique_node is not None:
+                node = unique_node
+            elif field.get('isArray', False):
+                node = ARRAY, self._compile_type(field['type'])
+            elif 'genericInfo' in field:
+                node = self._compile_generic(field['genericInfo'])
+            else:
+                node = self._compile_type(field['type'])
+            plan.append((field['name'], node))
+        return tuple(plan)
+
+    def _referenced_classes(self, class_name: str) -> Set[str]:
+        """获取类的字段直接引用的自定义类"""
+        referenced = set()
+        stack = [node for _, node in self.plans[class_name]]
+        while stack:
+            node = stack.pop()
+            if node[0] == OBJECT:
+                referenced.add(node[1])
+            elif node[0] in (COLLECTION, ARRAY):
+                stack.append(node[1])
+            elif node[0] == MAP:
+                stack.append(node[2])
+        return referenced
+
+    def _analyze_cycles(self, max_cycle_depth: int, cycle_depths: Dict[str, int]) -> Dict[str, int]:
+        """预先计算参与循环引用的类及其最大深度，非循环类生成时无需跟踪路径"""
+        graph = {name: self._referenced_classes(name) for name in self.plans}
+        limits = {}
+        for component in _strongly_connected_components(graph):
+            if len(component) == 1 and component[0] not in graph[component[0]]:
                 continue
+            depth = max((cycle_depths[name] for name in component if name in cycle_depths),
+                        default=max_cycle_depth)
+            for name in component:
+                limits[name] = depth
+        return limits
 
-            # 处理普通类型
-            result[field_name] = self._generate_value_by_type(field_type)
-
-        self.processed_classes.remove(class_name)
-        return result
-
-    def generate_example(self, class_name: Optional[str] = None) -> Dict[str, Any]:
-        """生成示例JSON数据"""
-        self.processed_classes.clear()
-
+    def _generate_primitive(self, type_name: str, rng=random) -> Any:
+        """生成基本类型的示例值"""
+        generator = PRIMITIVE_GENERATORS.get(type_name)
+        if generator is None:
+            return f"Unknown type: {type_name}"
+        return generator(rng)
+
+    def with_sizes(self, collection_size: int, map_size: int) -> 'JsonGenerator':
+        """返回共享已编译计划和唯一值分配器、仅集合大小不同的生成器"""
+        generator = copy.copy(self)
+        generator.collection_size = collection_size
+        generator.map_size = map_size
+        return generator
+
+    def with_fresh_allocators(self) -> 'JsonGenerator':
+        """返回唯一值分配器从头开始的生成器，用于试生成等不应消耗 ID 的场景"""
+        generator = copy.copy(self)
+        generator.allocators = {key: allocator.clone() for key, allocator in self.allocators.items()}
+        return generator
+
+    def _analyze_subtrees(self):
+        """
+        自底向上（Merkle 风格）计算每个类展开后的结构哈希：由类自身的计划、循环深度和所引用类的哈希组成，
+        同一强连通分量（循环引用）中的类先计算分量的哈希，再按类名区分。
+        同时收集每个类展开后会用到的唯一值分配器。
+        """
+        graph = {name: self._referenced_classes(name) for name in self.plans}
+        digests: Dict[str, str] = {}
+        unique_keys: Dict[str, Tuple[str, ...]] = {}
+        # Tarjan 算法按逆拓扑序输出分量，被引用的分量总是先完成
+        for component in _strongly_connected_components(graph):
+            members = set(component)
+            external = {target for name in component for target in graph[name] if target not in members}
+            description = repr((sorted((name, self.plans[name], self.cycle_limits.get(name))
+                                       for name in component), sorted(digests[target] for target in external)))
+            component_digest = hashlib.sha1(description.encode('utf-8')).hexdigest()
+            keys = {node[1] for name in component for _, node in self.plans[name] if node[0] == UNIQUE}
+            for target in external:
+                keys.update(unique_keys[target])
+            keys = tuple(sorted(keys))
+            for name in component:
+                digests[name] = hashlib.sha1(f"{component_digest}:{name}".encode('utf-8')).hexdigest()
+                unique_keys[name] = keys
+        self._subtree_hashes = digests
+        self._subtree_unique_keys = unique_keys
+
+    def _subtree_hash(self, class_name: str) -> str:
+        if not self._subtree_hashes:
+            self._analyze_subtrees()
+        return self._subtree_hashes[class_name]
+
+    def _unique_keys(self, class_name: str) -> Tuple[str, ...]:
+        """类展开后会用到的唯一值分配器"""
+        if not self._subtree_hashes:
+            self._analyze_subtrees()
+        return self._subtree_unique_keys[class_name]
+
+    def _cache_key(self, class_name: str, seed: int, path: Tuple[str, ...], unique_start: Tuple[int, ...]) -> str:
+        # 集合大小、唯一值的分配方式以及进入子树时各唯一字段的记录内序号同样决定子树内容
+        description = (f"{self._subtree_hash(class_name)}:{self.collection_size}:{self.map_size}:"
+                       f"{self.id_strategy}:{self.id_seed}:{self.shard}:{self.shard_count}:{seed}:{','.join(path)}:"
+                       f"{','.join(map(str, unique_start))}")
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    def _project_object(self, class_name: str, include: Optional[Dict[str, Any]],
+                        exclude: Optional[Dict[str, Any]], path: str) -> tuple:
+        """按前缀树裁剪类的字段计划；include 为 None 表示保留全部字段"""
+        plan = self.plans[class_name]
+        names = {field_name for field_name, _ in plan}
+        for name in list(include or ()) + list(exclude or ()):
+            if name not in names:
+                raise ValueError(f"Unknown field in projection: {path}{name} ({class_name})")
+        fields = []
+        for field_name, node in plan:
+            sub_include = None
+            if include is not None:
+                if field_name not in include:
+                    continue
+                sub_include = include[field_name]
+            sub_exclude = None
+            if exclude is not None and field_name in exclude:
+                sub_exclude = exclude[field_name]
+                if sub_exclude is None:
+                    continue
+            if sub_include is not None or sub_exclude is not None:
+                node = self._project_node(node, sub_include, sub_exclude, f"{path}{field_name}.")
+            fields.append((field_name, node))
+        salts = tuple(zlib.crc32(field_name.encode('utf-8')) for field_name, _ in fields)
+        return OBJECT, class_name, tuple(fields), salts
+
+    def _project_node(self, node: tuple, include: Optional[Dict[str, Any]],
+                      exclude: Optional[Dict[str, Any]], path: str) -> tuple:
+        """投影穿过集合、数组和 Map 的元素，作用到其中的对象上"""
+        kind = node[0]
+        if kind == OBJECT:
+            return self._project_object(node[1], include, exclude, path)
+        if kind == COLLECTION or kind == ARRAY:
+            return kind, self._project_node(node[1], include, exclude, path)
+        if kind == MAP:
+            return MAP, node[1], self._project_node(node[2], include, exclude, path)
+        raise ValueError(f"Cannot project into non-object field: {path.rstrip('.')}")
+
+    def compile_projection(self, class_name: str,
+                           projection: Union[Projection, Iterable[str]]) -> tuple:
+        """将投影编译为裁剪后的根节点，未选中的子树在生成时不会被访问"""
+        if not isinstance(projection, Projection):
+            projection = Projection(include=list(projection))
+        include = None if projection.include is None else tuple(sorted(projection.include))
+        exclude = tuple(sorted(projection.exclude))
+        key = (class_name, include, exclude)
+        root = self._projections.get(key)
+        if root is None:
+            root = self._project_object(class_name, None if include is None else _path_trie(include),
+                                        _path_trie(exclude) if exclude else None, '')
+            self._projections[key] = root
+        return root
+
+    def _root(self, class_name: str, projection: Union[Projection, Iterable[str], None]) -> tuple:
+        if projection is None:
+            return OBJECT, class_name
+        return self.compile_projection(class_name, projection)
+
+    def _map_keys(self, key_type: Optional[str], rng) -> List[str]:
+        """生成 Map 的键，重复的键会被合并"""
+        keys = {}
+        for i in range(self.map_size):
+            key = (self._generate_primitive(key_type, rng)
+                   if key_type in MAP_KEY_TYPES
+                   else f"key{i}")
+            keys[str(key)] = None
+        return list(keys)
+
+    def _build(self, root: tuple, seed: Optional[int] = None,
+               on_progress: Optional[Callable[[int], None]] = None) -> Any:
+        """
+        使用显式栈按节点生成值，所有状态都是局部的，可被多个线程同时调用。
+        指定 seed 时每个字段使用按字段路径派生的独立随机数生成器，结果可复现，
+        且不受其他子树或兄弟字段变化的影响，因此可以从子树缓存中取值，投影结果也是完整结果的子集。
+        此时唯一字段按其在记录内的序号取值（不消耗分配器）：同一记录内不重复且可复现，
+        不同种子的记录之间可能重复；一条记录需要的值超过取值空间时抛出 ExhaustedError。
+        """
+        cache = self.cache if seed is not None else None
+        # 按种子生成时每个唯一字段在本条记录内已使用的序号
+        unique_counts: Optional[Dict[str, int]] = {} if seed is not None else None
+        record_seed = seed
+        holder = [None]
+        # 栈帧: (父容器, 键, 节点, 路径上的循环类, 随机数生成器, 该位置的种子, 剩余可缓存层数)
+        stack = [(holder, 0, root, (), random, seed, CACHE_DEPTH if cache is not None else -1)]
+        processed = 0
+        progress_mask = PROGRESS_INTERVAL - 1
+        while stack:
+            parent, key, node, path, rng, seed, cache_depth = stack.pop()
+            processed += 1
+            if not processed & progress_mask and on_progress is not None:
+                on_progress(processed)
+            kind = node[0]
+            if seed is not None and kind != OBJECT and kind != _STORE:
+                rng = random.Random(seed)
+            if kind == PRIMITIVE:
+                parent[key] = PRIMITIVE_GENERATORS[node[1]](rng)
+            elif kind == ENUM:
+                parent[key] = rng.choice(node[1]) if node[1] else None
+            elif kind == UNIQUE:
+                allocator = self.allocators[node[1]]
+                if unique_counts is None:
+                    parent[key] = allocator.allocate()
+                else:
+                    index = unique_counts.get(node[1], 0)
+                    unique_counts[node[1]] = index + 1
+                    parent[key] = allocator.nth(index, record_seed)
+            elif kind == OBJECT:
+                class_name = node[1]
+                limit = self.cycle_limits.get(class_name)
+                if limit is not None and path.count(class_name) >= limit:
+                    parent[key] = {}
+                    continue
+                projected = len(node) > 2
+                cache_key = None
+                if seed is not None:
+                    # 投影后的子树与完整子树不同，不使用缓存
+                    if cache_depth >= 0 and not projected:
+                        unique_keys = self._unique_keys(class_name)
+                        unique_start = tuple(unique_counts.get(name, 0) for name in unique_keys)
+                        cache_key = self._cache_key(class_name, seed, path, unique_start)
+                        text = cache.get(cache_key)
+                        if text is not None:
+                            try:
+                                # 缓存内容为 [子树用掉的唯一值序号个数, 子树]
+                                used, parent[key] = json.loads(text)
+                                for name, count in zip(unique_keys, used):
+                                    unique_counts[name] = unique_counts.get(name, 0) + count
+                                continue
+                            except RecursionError:
+                                # 嵌套过深的子树无法用 json 模块解析，重新生成
+                                pass
+                    rng = random.Random(seed)
+                if limit is not None:
+                    path = path + (class_name,)
+                obj = {}
+                parent[key] = obj
+                if cache_key is not None:
+                    stack.append((parent, key, (_STORE, cache_key, unique_keys, unique_start), path, rng, seed, -1))
+                if cache_depth >= 0:
+                    cache_depth -= 1
+                # 逆序入栈，保证字段按声明顺序生成
+                if projected:
+                    plan, salts = node[2], node[3]
+                else:
+                    plan, salts = self.plans[class_name], self.field_salts[class_name]
+                for index in range(len(plan) - 1, -1, -1):
+                    field_name, field_node = plan[index]
+                    stack.append((obj, field_name, field_node, path, rng,
+                                  None if seed is None else mix64(seed, salts[index]), cache_depth))
+            elif kind == COLLECTION or kind == ARRAY:
+                items = [None] * self.collection_size
+                parent[key] = items
+                seeded = seed is not None and node[1][0] in _SEEDED_KINDS
+                for index in range(self.collection_size - 1, -1, -1):
+                    stack.append((items, index, node[1], path, rng, mix64(seed, index + 1) if seeded else None,
+                                  cache_depth))
+            elif kind == MAP:
+                map_keys = self._map_keys(node[1], rng)
+                result = dict.fromkeys(map_keys)
+                parent[key] = result
+                seeded = seed is not None and node[2][0] in _SEEDED_KINDS
+                for index in range(len(map_keys) - 1, -1, -1):
+                    stack.append((result, map_keys[index], node[2], path, rng,
+                                  mix64(seed, index + 1) if seeded else None, cache_depth))
+            elif kind == _STORE:
+                entry = [[unique_counts.get(name, 0) - start for name, start in zip(node[2], node[3])], parent[key]]
+                try:
+                    text = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+                except RecursionError:
+                    # 嵌套过深时退回到显式栈的序列化
+                    text = dumps_json(entry, separators=(',', ':'))
+                cache.put(node[1], text)
+            else:
+                parent[key] = node[1]()
+        return holder[0]
+
+    def resolve_class_name(self, class_name: Optional[str]) -> Optional[str]:
+        """确定要生成的类，未找到时返回 None"""
         # 如果没有指定类名，使用第一个类
         if not class_name and self.parsed_info['classes']:
             class_name = self.parsed_info['classes'][0]['name']
-
-        if not class_name:
+        if not class_name or class_name not in self.plans:
+            return None
+        return class_name
+
+    def generate_example(self, class_name: Optional[str] = None, seed: Optional[int] = None,
+                         projection: Union[Projection, Iterable[str], None] = None,
+                         on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        生成示例JSON数据；指定 seed 时结果可复现，配置了缓存时未变化的子树直接从缓存中取值。
+        按种子生成时 @Id 等唯一字段在同一记录内不重复，序列分配器每条记录从 1 开始编号，
+        不同种子的记录之间可能重复。
+        projection 为路径列表或 Projection 时只生成选中的字段。
+        on_progress 每处理 PROGRESS_INTERVAL 个节点调用一次，参数为已处理的节点数；
+        回调抛出的异常会中止生成，可用于取消。
+        """
+        class_name = self.resolve_class_name(class_name)
+        if class_name is None:
             return {}
 
-        return self._generate_object(class_name)
-
-    def to_json(self, class_name: Optional[str] = None, indent: int = 2) -> str:
-        """生成格式化的JSON字符串"""
-        return json.dumps(
-            self.generate_example(class_name),
-            indent=indent,
-            ensure_ascii=False
-        )
+        return self._build(self._root(class_name, projection), seed, on_progress)
+
+    def iter_json(self, class_name: Optional[str] = None, chunk_size: int = 1 << 16,
+                  projection: Union[Projection, Iterable[str], None] = None) -> Iterator[str]:
+        """流式生成紧凑格式的 JSON 文本，不在内存中构建完整对象"""
+        class_name = self.resolve_class_name(class_name)
+        if class_name is None:
+            yield '{}'
+            return
+
+        rng = random
+        dumps = json.dumps
+        parts: List[str] = []
+        size = 0
+        # 栈帧: 字符串为待输出的文本；(节点, 路径) 为待生成的值；
+        # (节点, 路径, 剩余个数) 为集合中尚未生成的元素
+        stack: List[Any] = [(self._root(class_name, projection), ())]
+        while stack:
+            frame = stack.pop()
+            if frame.__class__ is str:
+                text = frame
+            elif len(frame) == 3:
+                node, path, remaining = frame
+                if remaining > 1:
+                    stack.append((node, path, remaining - 1))
+                    stack.append(', ')
+                stack.append((node, path))
+                continue
+            else:
+                node, path = frame
+                kind = node[0]
+                if kind == PRIMITIVE:
+                    text = dumps(PRIMITIVE_GENERATORS[node[1]](rng), ensure_ascii=False)
+                elif kind == ENUM:
+                    text = dumps(rng.choice(node[1]) if node[1] else None)
+                elif kind == UNIQUE:
+                    text = dumps(self.allocators[node[1]].allocate())
+                elif kind == OBJECT:
+                    class_name = node[1]
+                    limit = self.cycle_limits.get(class_name)
+                    if limit is not None and path.count(class_name) >= limit:
+                        text = '{}'
+                    else:
+                        if limit is not None:
+                            path = path + (class_name,)
+                        stack.append('}')
+                        fields = node[2] if len(node) > 2 else self.plans[class_name]
+                        for index in range(len(fields) - 1, -1, -1):
+                            field_name, field_node = fields[index]
+                            stack.append((field_node, path))
+                            stack.append((', ' if index else '') + dumps(field_name, ensure_ascii=False) + ': ')
+                        text = '{'
+                elif kind == COLLECTION or kind == ARRAY:
+                    stack.append(']')
+                    if self.collection_size:
+                        stack.append((node[1], path, self.collection_size))
+                    text = '['
+                elif kind == MAP:
+                    map_keys = self._map_keys(node[1], rng)
+                    stack.append('}')
+                    for index in range(len(map_keys) - 1, -1, -1):
+                        stack.append((node[2], path))
+                        stack.append((', ' if index else '') + dumps(map_keys[index], ensure_ascii=False) + ': ')
+                    text = '{'
+                else:
+                    text = '[]' if node[1] is list else '{}'
+            parts.append(text)
+            size += len(text)
+            if size >= chunk_size:
+                yield ''.join(parts)
+                parts = []
+                size = 0
+        if parts:
+            yield ''.join(parts)
+
+    def to_json(self, class_name: Optional[str] = None, indent: int = 2, seed: Optional[int] = None,
+                projection: Union[Projection, Iterable[str], None] = None) -> str:
+        """生成格式化的JSON字符串；与 generate_example 一样不受嵌套深度限制"""
+        return dumps_json(self.generate_example(class_name, seed, projection), indent)
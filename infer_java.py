@@ -0,0 +1,368 @@
+import json
+import re
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from parse_java import ClassInfo, EnumConstant, EnumInfo, FieldInfo, FieldType, GenericInfo, JavaEntityParser
+
+CHUNK_SIZE = 1 << 16
+# 跟在已解码数字后面时说明数字被截断的字符
+NUMBER_CONTINUATIONS = '.eE+-'
+
+JAVA_KEYWORDS = {
+    'abstract', 'assert', 'boolean', 'break', 'byte', 'case', 'catch', 'char', 'class', 'const',
+    'continue', 'default', 'do', 'double', 'else', 'enum', 'extends', 'final', 'finally', 'float',
+    'for', 'goto', 'if', 'implements', 'import', 'instanceof', 'int', 'interface', 'long', 'native',
+    'new', 'package', 'private', 'protected', 'public', 'return', 'short', 'static', 'strictfp',
+    'super', 'switch', 'synchronized', 'this', 'throw', 'throws', 'transient', 'try', 'void',
+    'volatile', 'while', 'true', 'false', 'null'
+}
+
+# 不能用作生成类名的类型名：解析器按名称识别的类型和常用的 java.lang 类
+RESERVED_CLASS_NAMES = (
+    JavaEntityParser.PRIMITIVE_TYPES | JavaEntityParser.COLLECTION_TYPES | JavaEntityParser.MAP_TYPES | {
+        'Object', 'Class', 'Number', 'Enum', 'Record', 'Void', 'Iterable', 'Comparable', 'Math',
+        'System', 'Thread', 'Runtime', 'Exception', 'Error', 'Throwable', 'Override', 'Optional', 'UUID'
+    }
+)
+
+IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_$][A-Za-z0-9_$]*$')
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+DATETIME_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}')
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def iter_json_values(fp: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """增量解码 NDJSON 或 JSON 数组，逐条返回记录，内存只保留当前记录"""
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+    in_array: Optional[bool] = None
+    read_size = chunk_size
+
+    while True:
+        # 跳过空白与分隔符，必要时读取更多数据
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = fp.read(read_size)
+            if not chunk:
+                eof = True
+            buf, pos = buf[pos:] + chunk, 0
+        if pos >= len(buf):
+            return
+
+        if in_array is None:
+            in_array = buf[pos] == '['
+            if in_array:
+                pos += 1
+                continue
+        if in_array and buf[pos] == ']':
+            pos += 1
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            # 数字等值可能在块边界被截断（如 12|345、78.|9、1e|21），
+            # 未到文件末尾时需要确认后面还有内容，且不是数字的后续部分
+            complete = eof or (end < len(buf) and buf[end] not in NUMBER_CONTINUATIONS)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            chunk = fp.read(read_size)
+            if not chunk:
+                eof = True
+            buf, pos = buf[pos:] + chunk, 0
+            # 超大记录时成倍扩大读取量，避免反复从头解码
+            read_size = max(chunk_size, len(buf))
+            continue
+
+        read_size = chunk_size
+        yield value
+        pos = end
+
+
+class Shape:
+    """单个位置上观察到的值的形状汇总，内存占用有上限"""
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.bools = 0
+        self.ints = 0
+        self.floats = 0
+        self.strings = 0
+        self.objects = 0
+        self.arrays = 0
+        self.int_min = 0
+        self.int_max = 0
+        self.dates = 0
+        self.datetimes = 0
+        # 低基数字符串草图：超过上限后置为 None，不再记录
+        self.distinct: Optional[Dict[str, None]] = {}
+        self.fields: Dict[str, 'Shape'] = {}
+        self.map_values: Optional['Shape'] = None
+        self.element: Optional['Shape'] = None
+
+    def observe(self, value: Any, max_enum_values: int, max_fields: int):
+        self.count += 1
+        if value is None:
+            self.nulls += 1
+        elif isinstance(value, bool):
+            self.bools += 1
+        elif isinstance(value, int):
+            if not self.ints:
+                self.int_min = self.int_max = value
+            self.ints += 1
+            self.int_min = min(self.int_min, value)
+            self.int_max = max(self.int_max, value)
+        elif isinstance(value, float):
+            self.floats += 1
+        elif isinstance(value, str):
+            self.strings += 1
+            if DATETIME_PATTERN.match(value):
+                self.datetimes += 1
+            elif DATE_PATTERN.match(value):
+                self.dates += 1
+            if self.distinct is not None and value not in self.distinct:
+                if len(self.distinct) >= max_enum_values or not IDENTIFIER_PATTERN.match(value) \
+                        or value in JAVA_KEYWORDS:
+                    self.distinct = None
+                else:
+                    self.distinct[value] = None
+        elif isinstance(value, list):
+            self.arrays += 1
+            if self.element is None:
+                self.element = Shape()
+            for item in value:
+                self.element.observe(item, max_enum_values, max_fields)
+        elif isinstance(value, dict):
+            self.objects += 1
+            self._observe_object(value, max_enum_values, max_fields)
+
+    def _observe_object(self, value: Dict[str, Any], max_enum_values: int, max_fields: int):
+        if self.map_values is None:
+            new_keys = [key for key in value if key not in self.fields]
+            if len(self.fields) + len(new_keys) > max_fields \
+                    or any(not IDENTIFIER_PATTERN.match(key) for key in new_keys):
+                # 键过多或不是合法标识符时按 Map 处理，合并所有值的形状
+                self.map_values = Shape()
+                for shape in self.fields.values():
+                    self.map_values.merge(shape)
+                self.fields = {}
+        if self.map_values is not None:
+            for item in value.values():
+                self.map_values.observe(item, max_enum_values, max_fields)
+            return
+        for key, item in value.items():
+            shape = self.fields.get(key)
+            if shape is None:
+                shape = self.fields[key] = Shape()
+            shape.observe(item, max_enum_values, max_fields)
+
+    def merge(self, other: 'Shape'):
+        """合并另一个形状（用于对象退化为 Map 时）"""
+        for name in ('count', 'nulls', 'bools', 'floats', 'strings', 'objects', 'arrays', 'dates', 'datetimes'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        if other.ints:
+            self.int_min = min(self.int_min, other.int_min) if self.ints else other.int_min
+            self.int_max = max(self.int_max, other.int_max) if self.ints else other.int_max
+            self.ints += other.ints
+        if self.distinct is not None:
+            if other.distinct is None:
+                self.distinct = None
+            else:
+                self.distinct.update(other.distinct)
+        if other.element is not None:
+            if self.element is None:
+                self.element = Shape()
+            self.element.merge(other.element)
+        if other.map_values is not None or other.fields:
+            if self.map_values is None:
+                self.map_values = Shape()
+            if other.map_values is not None:
+                self.map_values.merge(other.map_values)
+            for shape in other.fields.values():
+                self.map_values.merge(shape)
+
+
+def _pascal_case(name: str) -> str:
+    parts = re.split(r'[_$]+', name)
+    return ''.join(part[:1].upper() + part[1:] for part in parts if part) or 'Item'
+
+
+def _singular(name: str) -> str:
+    """简单的英文单数化，用于集合元素的类名"""
+    if name.endswith('ies') and len(name) > 4:
+        return name[:-3] + 'y'
+    if name.endswith('s') and not name.endswith('ss') and len(name) > 3:
+        return name[:-1]
+    return name + 'Item'
+
+
+class JsonShapeInferer:
+    """从大量 JSON 样本中流式推断 Java 实体类、枚举和泛型集合类型"""
+
+    def __init__(self, root_name: str = 'Root', max_enum_values: int = 16,
+                 min_enum_samples: int = 10, max_fields: int = 64):
+        self.root_name = root_name
+        self.max_enum_values = max_enum_values
+        self.min_enum_samples = min_enum_samples
+        self.max_fields = max_fields
+        self.root = Shape()
+        self.records = 0
+
+    def observe(self, value: Any):
+        """合并一条记录的形状"""
+        self.root.observe(value, self.max_enum_values, self.max_fields)
+        self.records += 1
+
+    def feed(self, fp: IO[str], chunk_size: int = CHUNK_SIZE) -> int:
+        """从文件对象中流式读取记录，返回读取的记录数"""
+        before = self.records
+        for value in iter_json_values(fp, chunk_size):
+            self.observe(value)
+        return self.records - before
+
+    def feed_file(self, path: str) -> int:
+        with open(path, encoding='utf-8') as f:
+            return self.feed(f)
+
+    def _is_enum(self, shape: Shape) -> bool:
+        """低基数且重复出现的标识符字符串视为枚举"""
+        return (shape.distinct is not None and 0 < len(shape.distinct)
+                and shape.strings >= self.min_enum_samples
+                and len(shape.distinct) * 2 <= shape.strings)
+
+    def build(self) -> Tuple[List[ClassInfo], List[EnumInfo]]:
+        """根据汇总的形状生成类与枚举定义"""
+        if self.root.objects == 0:
+            raise ValueError("Root records must be JSON objects")
+        classes: List[ClassInfo] = []
+        enums: List[EnumInfo] = []
+        used_names = set()
+
+        def unique_name(base: str) -> str:
+            name = base
+            suffix = 2
+            while name in used_names or name in JAVA_KEYWORDS or name in RESERVED_CLASS_NAMES:
+                name = f"{base}{suffix}"
+                suffix += 1
+            used_names.add(name)
+            return name
+
+        pending = [(unique_name(_pascal_case(self.root_name)), self.root)]
+
+        def resolve(shape: Optional[Shape], hint: str) -> Any:
+            """返回类型名（字符串）或 GenericInfo"""
+            if shape is None or shape.count == shape.nulls:
+                return 'String'
+            non_null = shape.count - shape.nulls
+            if shape.objects == non_null:
+                if shape.map_values is not None:
+                    return GenericInfo('Map', ['String', resolve(shape.map_values, hint)])
+                name = unique_name(_pascal_case(hint))
+                pending.append((name, shape))
+                return name
+            if shape.arrays == non_null:
+                return GenericInfo('List', [resolve(shape.element, _singular(hint))])
+            if shape.bools == non_null:
+                return 'Boolean'
+            if shape.ints == non_null:
+                return 'Integer' if INT_MIN <= shape.int_min and shape.int_max <= INT_MAX else 'Long'
+            if shape.ints + shape.floats == non_null:
+                return 'Double'
+            if shape.strings == non_null:
+                if shape.datetimes == non_null:
+                    return 'LocalDateTime'
+                if shape.dates == non_null:
+                    return 'LocalDate'
+                if self._is_enum(shape):
+                    name = unique_name(_pascal_case(hint))
+                    enums.append(EnumInfo(
+                        name=name,
+                        constants=[EnumConstant(name=value, arguments=[]) for value in shape.distinct],
+                        annotations=[],
+                        modifiers=['public']
+                    ))
+                    return name
+            return 'String'
+
+        enum_names = set()
+        while pending:
+            class_name, shape = pending.pop(0)
+            fields = []
+            for key, field_shape in shape.fields.items():
+                resolved = resolve(field_shape, key)
+                enum_names.update(enum.name for enum in enums)
+                annotations = []
+                field_name = key
+                if key in JAVA_KEYWORDS:
+                    field_name = key + '_'
+                    annotations.append({'name': 'JsonProperty', 'parameters': {'value': key}})
+                if isinstance(resolved, GenericInfo):
+                    field_type = FieldType.MAP if resolved.raw_type == 'Map' else FieldType.COLLECTION
+                    fields.append(FieldInfo(field_name, resolved.raw_type, field_type, ['private'],
+                                            generic_info=resolved, annotations=annotations))
+                else:
+                    if resolved in enum_names:
+                        field_type = FieldType.ENUM
+                    elif resolved in used_names:
+                        field_type = FieldType.CUSTOM
+                    else:
+                        field_type = FieldType.PRIMITIVE
+                    fields.append(FieldInfo(field_name, resolved, field_type, ['private'],
+                                            annotations=annotations))
+            classes.append(ClassInfo(name=class_name, modifiers=['public'], fields=fields, annotations=[]))
+        return classes, enums
+
+    def to_java(self) -> str:
+        """生成可被 JavaEntityParser 解析的 Java 源码"""
+        classes, enums = self.build()
+        return render_java(classes, enums)
+
+
+def _render_type(type_info: Any) -> str:
+    if isinstance(type_info, GenericInfo):
+        return f"{type_info.raw_type}<{', '.join(_render_type(arg) for arg in type_info.type_arguments)}>"
+    return type_info
+
+
+def render_java(classes: List[ClassInfo], enums: List[EnumInfo]) -> str:
+    """将类与枚举定义渲染为 Java 源码"""
+    lines = []
+    for class_info in classes:
+        lines.append(f"public class {class_info.name} {{")
+        for field in class_info.fields:
+            for annotation in field.annotations:
+                value = annotation['parameters'].get('value')
+                lines.append(f'    @{annotation["name"]}("{value}")' if value else f'    @{annotation["name"]}')
+            type_name = _render_type(field.generic_info or field.type)
+            lines.append(f"    private {type_name}{'[]' if field.is_array else ''} {field.name};")
+        lines.append("}")
+        lines.append("")
+    for enum_info in enums:
+        lines.append(f"public enum {enum_info.name} {{")
+        lines.append(",\n".join(f"    {constant.name}" for constant in enum_info.constants))
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="从 NDJSON / JSON 数组样本推断 Java 实体类")
+    arg_parser.add_argument("samples", nargs="+", help="样本文件路径")
+    arg_parser.add_argument("--root", default="Root", help="根类名")
+    arg_parser.add_argument("--max-enum-values", type=int, default=16, help="枚举最多的取值数")
+    args = arg_parser.parse_args()
+
+    inferer = JsonShapeInferer(root_name=args.root, max_enum_values=args.max_enum_values)
+    for sample_path in args.samples:
+        inferer.feed_file(sample_path)
+    print(inferer.to_java())
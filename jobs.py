@@ -0,0 +1,144 @@
+import gzip
+import tempfile
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Dict, Optional
+
+from estimate import GenerationLimits, choose_mode, estimate_output
+from generate_json import JsonGenerator, dumps_json
+from parse_java import JavaEntityParser
+
+# 流式生成时页面上展示的预览长度
+PREVIEW_CHARS = 20000
+
+
+class JobCancelled(Exception):
+    """任务被取消"""
+
+
+class GenerationJob:
+    """在后台线程中解析 Java 代码并生成 JSON，可查询进度、可取消"""
+
+    def __init__(self, java_code: str, collection_size: int = 1, map_size: int = 1,
+                 record_count: int = 1, limits: Optional[GenerationLimits] = None, indent: int = 2):
+        self.java_code = java_code
+        self.collection_size = collection_size
+        self.map_size = map_size
+        self.record_count = max(record_count, 1)
+        self.limits = limits or GenerationLimits()
+        self.indent = indent
+        # pending / running / done / cancelled / failed
+        self.status = 'pending'
+        self.classes_parsed = 0
+        self.records_generated = 0
+        # 只生成一条记录时按已处理的节点数和预估值个数显示进度
+        self.values_generated = 0
+        self.expected_values = 0
+        self.parsed_info: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('done', 'cancelled', 'failed')
+
+    @property
+    def progress(self) -> float:
+        if self.record_count == 1 and not self.records_generated and self.expected_values:
+            return min(self.values_generated / self.expected_values, 0.99)
+        return self.records_generated / self.record_count
+
+    def submit(self, executor: Executor) -> 'GenerationJob':
+        self.future = executor.submit(self.run)
+        return self
+
+    def cancel(self):
+        """请求取消；尚未开始执行的任务直接从队列中移除"""
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.status = 'cancelled'
+
+    def _check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def run(self):
+        if self._cancel_event.is_set():
+            self.status = 'cancelled'
+            return
+        self.status = 'running'
+        try:
+            # 解析 Java 代码
+            self.parsed_info = JavaEntityParser(self.java_code).get_parsed_info()
+            self.classes_parsed = len(self.parsed_info['classes'])
+            self._check_cancelled()
+
+            # 先估算输出规模，超出内存限制时切换为流式生成
+            generator = JsonGenerator(self.parsed_info, collection_size=self.collection_size,
+                                      map_size=self.map_size)
+            estimate = estimate_output(generator).scaled(self.record_count)
+            self.expected_values = estimate.expected_values
+            mode = choose_mode(estimate, self.limits)
+            result = {"estimate": estimate, "data": None, "json": None, "preview": None, "gzip": None}
+            if mode == "stream":
+                result["preview"], result["gzip"] = self._generate_stream(generator)
+            else:
+                result["data"] = self._generate_data(generator)
+                # 只序列化一次，页面展示和下载共用
+                result["json"] = dumps_json(result["data"], self.indent)
+            self.result = result
+            self.status = 'done'
+        except JobCancelled:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.error = str(e)
+            self.status = 'failed'
+
+    def _on_progress(self, values: int):
+        self._check_cancelled()
+        self.values_generated = values
+
+    def _generate_data(self, generator: JsonGenerator) -> Any:
+        """在内存中生成；多条记录时为列表"""
+        if self.record_count == 1:
+            # 单条记录可能接近内存上限，生成过程中也要响应取消
+            example = generator.generate_example(on_progress=self._on_progress)
+            self.records_generated = 1
+            return example
+        records = []
+        for _ in range(self.record_count):
+            self._check_cancelled()
+            records.append(generator.generate_example())
+            self.records_generated += 1
+        return records
+
+    def _generate_stream(self, generator: JsonGenerator) -> tuple[str, bytes]:
+        """流式生成 JSON 并压缩到临时文件，返回预览文本和 gzip 数据（大小已由 choose_mode 限制）"""
+        preview = []
+        preview_size = 0
+
+        def write(text: str):
+            nonlocal preview_size
+            if preview_size < PREVIEW_CHARS:
+                preview.append(text[:PREVIEW_CHARS - preview_size])
+                preview_size += len(preview[-1])
+            gz.write(text.encode("utf-8"))
+
+        with tempfile.TemporaryFile() as buffer:
+            with gzip.GzipFile(fileobj=buffer, mode="wb") as gz:
+                many = self.record_count > 1
+                if many:
+                    write("[")
+                for index in range(self.record_count):
+                    if index:
+                        write(", ")
+                    for chunk in generator.iter_json():
+                        self._check_cancelled()
+                        write(chunk)
+                    self.records_generated += 1
+                if many:
+                    write("]")
+            buffer.seek(0)
+            return "".join(preview), buffer.read()
@@ -0,0 +1,349 @@
+import asyncio
+import json
+import ssl
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from generate_json import JsonGenerator, Projection
+
+
+class LatencyHistogram:
+    """对数分桶的延迟直方图：每个桶保留数值的高 6 位，相对误差不超过 1/32，内存与样本数无关"""
+
+    SIGNIFICANT_BITS = 6
+
+    def __init__(self):
+        self.counts: Counter = Counter()  # 桶下界（微秒） -> 次数
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, seconds: float):
+        micros = max(int(seconds * 1_000_000), 0)
+        shift = max(micros.bit_length() - self.SIGNIFICANT_BITS, 0)
+        self.counts[(micros >> shift) << shift] += 1
+        self.count += 1
+        self.total += micros
+        self.max = max(self.max, micros)
+
+    def merge(self, other: 'LatencyHistogram'):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        """平均延迟（秒）"""
+        return self.total / self.count / 1_000_000 if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """百分位延迟（秒），取所在桶的下界"""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * percent / 100))
+        seen = 0
+        for lower in sorted(self.counts):
+            seen += self.counts[lower]
+            if seen >= rank:
+                return lower / 1_000_000
+        return self.max / 1_000_000
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """按 2 的幂合并后的 (上界毫秒, 次数)，用于展示"""
+        merged: Counter = Counter()
+        for lower, count in self.counts.items():
+            merged[1 << lower.bit_length()] += count
+        return [(upper / 1000, merged[upper]) for upper in sorted(merged)]
+
+    def format(self, width: int = 40) -> str:
+        rows = self.buckets()
+        peak = max((count for _, count in rows), default=0)
+        lines = []
+        for upper_ms, count in rows:
+            bar = '#' * max(1, round(count / peak * width)) if count else ''
+            lines.append(f"  <= {upper_ms:>10.3f} ms {count:>8} {bar}")
+        return '\n'.join(lines)
+
+
+@dataclass
+class LoadStats:
+    scheduled: int = 0
+    completed: int = 0
+    errors: int = 0
+    dropped: int = 0       # 在途请求达到上限时放弃的请求
+    bytes_sent: int = 0
+    elapsed: float = 0.0
+    status_counts: Counter = field(default_factory=Counter)
+    error_counts: Counter = field(default_factory=Counter)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def throughput(self) -> float:
+        """每秒完成的请求数"""
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        latency = self.latency
+        lines = [
+            f"scheduled {self.scheduled}, completed {self.completed}, errors {self.errors}, "
+            f"dropped {self.dropped} in {self.elapsed:.2f} s",
+            f"throughput {self.throughput:,.1f} req/s, sent {self.bytes_sent:,} bytes",
+            f"status {dict(sorted(self.status_counts.items()))}",
+            "latency " + ", ".join(
+                f"p{p:g} {latency.percentile(p) * 1000:.2f} ms" for p in (50, 90, 99, 99.9))
+            + f", mean {latency.mean * 1000:.2f} ms, max {latency.max / 1000:.2f} ms",
+            latency.format()
+        ]
+        if self.error_counts:
+            lines.insert(3, f"errors {dict(self.error_counts)}")
+        return '\n'.join(lines)
+
+
+class HttpError(ValueError):
+    """响应格式错误"""
+
+
+class ConnectionPool:
+    """HTTP/1.1 keep-alive 连接池，连接数不超过 size"""
+
+    def __init__(self, host: str, port: int, size: int, ssl_context: Optional[ssl.SSLContext] = None):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        await self.slots.acquire()
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        try:
+            connection = await asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+        except BaseException:
+            self.slots.release()
+            raise
+        self.opened += 1
+        return connection
+
+    def release(self, connection: Tuple[asyncio.StreamReader, asyncio.StreamWriter], reusable: bool):
+        if reusable:
+            self.idle.append(connection)
+        else:
+            connection[1].close()
+        self.slots.release()
+
+    async def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        for _, writer in self.idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        self.idle.clear()
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    """读取一个完整的响应，返回 (状态码, 连接是否可复用)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split(' ', 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise HttpError(f"Bad status line: {lines[0]!r}")
+    status = int(parts[1])
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif status >= 200 and status not in (204, 304):
+        # 没有长度信息时响应体以连接关闭结束
+        await reader.read()
+        return status, False
+    keep_alive = headers.get('connection', '').lower() != 'close' and parts[0] != 'HTTP/1.0'
+    return status, keep_alive
+
+
+class LoadDriver:
+    """按目标 RPS 开环发送生成的请求体：请求按计划时间发出，不等待之前的响应"""
+
+    def __init__(self, generator: JsonGenerator, url: str, class_name: Optional[str] = None,
+                 rps: float = 100.0, duration: float = 10.0, max_in_flight: int = 64,
+                 connections: int = 16, method: str = 'POST', headers: Optional[Dict[str, str]] = None,
+                 timeout: float = 10.0, projection: Union[Projection, Iterable[str], None] = None):
+        """
+        rps: 目标每秒请求数
+        max_in_flight: 在途请求上限，达到上限时本次请求记为 dropped，不会推迟后续计划
+        connections: keep-alive 连接数上限
+        """
+        if rps <= 0 or duration <= 0:
+            raise ValueError("rps and duration must be positive")
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        self.generator = generator
+        self.class_name = generator.resolve_class_name(class_name)
+        if self.class_name is None:
+            raise ValueError("No class to generate")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl_context = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self.rps = rps
+        self.duration = duration
+        self.max_in_flight = max_in_flight
+        self.connections = connections
+        self.method = method
+        self.timeout = timeout
+        self.projection = projection
+        host_header = self.host if parts.port is None else f"{self.host}:{self.port}"
+        # 请求头中除 Content-Length 外的部分只编码一次
+        header_lines = [f"{method} {self.path} HTTP/1.1", f"Host: {host_header}",
+                        "Content-Type: application/json", "Connection: keep-alive"]
+        header_lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self._head = ('\r\n'.join(header_lines) + '\r\nContent-Length: ').encode('latin-1')
+
+    def _request(self) -> bytes:
+        body = json.dumps(self.generator.generate_example(self.class_name, projection=self.projection),
+                          ensure_ascii=False).encode('utf-8')
+        return self._head + str(len(body)).encode('ascii') + b'\r\n\r\n' + body
+
+    async def _send(self, pool: ConnectionPool, request: bytes, scheduled: float, stats: LoadStats):
+        """发送一个请求；延迟从计划发送时间算起，避免协调遗漏"""
+        connection = None
+        reusable = False
+        try:
+            connection = await asyncio.wait_for(pool.acquire(), self.timeout)
+            reader, writer = connection
+            writer.write(request)
+            await writer.drain()
+            status, reusable = await asyncio.wait_for(_read_response(reader), self.timeout)
+            stats.latency.record(time.perf_counter() - scheduled)
+            stats.status_counts[status] += 1
+            stats.completed += 1
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                HttpError, ValueError) as e:
+            # 响应头超过 StreamReader 的缓冲上限时 readuntil 抛出 LimitOverrunError，计为错误而不是中止压测
+            stats.errors += 1
+            stats.error_counts[type(e).__name__] += 1
+        finally:
+            if connection is not None:
+                pool.release(connection, reusable)
+
+    async def run(self) -> LoadStats:
+        stats = LoadStats()
+        pool = ConnectionPool(self.host, self.port, self.connections, self.ssl_context)
+        in_flight = set()
+        total = int(self.rps * self.duration)
+        interval = 1.0 / self.rps
+        start = time.perf_counter()
+        try:
+            for index in range(total):
+                scheduled = start + index * interval
+                delay = scheduled - time.perf_counter()
+                # 落后于计划时也要让出事件循环，否则进行中的请求无法推进，后续请求会被误计为丢弃
+                await asyncio.sleep(delay if delay > 0 else 0)
+                stats.scheduled += 1
+                if len(in_flight) >= self.max_in_flight:
+                    stats.dropped += 1
+                    continue
+                request = self._request()
+                stats.bytes_sent += len(request)
+                task = asyncio.create_task(self._send(pool, request, scheduled, stats))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        finally:
+            stats.elapsed = time.perf_counter() - start
+            await pool.close()
+        return stats
+
+
+def run_load(generator: JsonGenerator, url: str, **kwargs) -> LoadStats:
+    """同步入口"""
+    return asyncio.run(LoadDriver(generator, url, **kwargs).run())
+
+
+async def start_stand_in_server(host: str = '127.0.0.1', port: int = 0,
+                                delay: float = 0.0) -> asyncio.AbstractServer:
+    """本地替身服务：支持 keep-alive，读取请求体后返回 200，可模拟处理耗时"""
+    response = b'{"ok":true}'
+    response_head = b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n' % len(response)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = 0
+                for line in head.split(b'\r\n'):
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':', 1)[1])
+                await reader.readexactly(length)
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(response_head + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from parse_java import JavaEntityParser
+
+    arg_parser = argparse.ArgumentParser(description="按目标 RPS 向 HTTP 接口发送生成的 JSON 请求体")
+    arg_parser.add_argument("source", help="Java 源文件路径")
+    arg_parser.add_argument("--url", help="目标地址，未指定时启动本地替身服务")
+    arg_parser.add_argument("--class", dest="class_name", help="请求体的类名，默认第一个类")
+    arg_parser.add_argument("--rps", type=float, default=200, help="目标每秒请求数")
+    arg_parser.add_argument("--duration", type=float, default=5, help="持续时间（秒）")
+    arg_parser.add_argument("--max-in-flight", type=int, default=64, help="在途请求上限")
+    arg_parser.add_argument("--connections", type=int, default=16, help="连接数上限")
+    arg_parser.add_argument("--server-delay", type=float, default=0.002, help="替身服务的模拟处理耗时（秒）")
+    args = arg_parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        info = JavaEntityParser(f.read()).get_parsed_info()
+    load_generator = JsonGenerator(info)
+
+    async def main():
+        server = None
+        url = args.url
+        if url is None:
+            server = await start_stand_in_server(delay=args.server_delay)
+            url = "http://127.0.0.1:%d/" % server.sockets[0].getsockname()[1]
+            print(f"stand-in server at {url}")
+        try:
+            driver = LoadDriver(load_generator, url, args.class_name, rps=args.rps, duration=args.duration,
+                                max_in_flight=args.max_in_flight, connections=args.connections)
+            stats = await driver.run()
+        finally:
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+        print(stats.summary())
+
+    asyncio.run(main())
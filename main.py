@@ -1,10 +1,18 @@
-import pandas as pd
 import streamlit as st
 from streamlit.components.v1 import html
-import json
-from typing import Dict, Any, Set, List
-from parse_java import JavaEntityParser  # 假设我们之前的解析器代码保存在 java_parser.py
-from generate_json import JsonGenerator  # 假设我们之前的生成器代码保存在 json_generator.py
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Set, List, Optional
+from estimate import GenerationLimits, OutputEstimate
+from jobs import GenerationJob
+
+# 在线服务的生成限制：超过内存限制时切换为流式生成并压缩下载
+GENERATION_LIMITS = GenerationLimits(
+    max_memory_bytes=128 * 1024 * 1024,
+    max_output_bytes=512 * 1024 * 1024
+)
+# 所有会话共享的后台生成线程数，超出的任务排队等待
+GENERATION_WORKERS = 4
 
 # SEO相关的HTML代码
 seo_html = """
@@ -65,7 +73,7 @@ st.set_page_config(
 )
 
 # 自定义CSS样式
-st.markdown("""
+CUSTOM_HTML = """
     <style>
         /* 隐藏 Streamlit 默认元素 */
         #MainMenu {visibility: hidden;}
@@ -179,7 +187,18 @@ st.markdown("""
         <h1>JsonCraft ⚒️</h1>
         <p>Turning Java Entities into Perfect JSON, Effortlessly</p>
     </div>
-""", unsafe_allow_html=True)
+"""
+st.markdown(CUSTOM_HTML, unsafe_allow_html=True)
+
+# 页脚
+FOOTER_HTML = """
+            <div class="footer">
+                <p style="margin: 0;">Made with ❤️ by damao</p>
+                <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem;">
+                    ⭐ 支持多重嵌套泛型 | 🎯 完整枚举解析 | 🔄 数组类型支持
+                </p>
+            </div>
+        """
 
 
 def create_example_code() -> str:
@@ -234,29 +253,62 @@ public enum UserType {
 """
 
 
-def format_json(json_str: str) -> str:
-    """格式化 JSON 字符串"""
-    try:
-        parsed = json.loads(json_str)
-        return json.dumps(parsed, indent=2, ensure_ascii=False)
-    except json.JSONDecodeError:
-        return json_str
-
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """所有会话共享的后台生成线程池"""
+    return ThreadPoolExecutor(max_workers=GENERATION_WORKERS, thread_name_prefix="jsoncraft-job")
+
+
+def start_job(java_code: str, collection_size: int, map_size: int, record_count: int) -> GenerationJob:
+    """提交后台生成任务"""
+    job = GenerationJob(java_code, collection_size, map_size, record_count, limits=GENERATION_LIMITS)
+    return job.submit(get_executor())
+
+
+def finish_job(job: GenerationJob):
+    """任务结束后将结果写入会话状态"""
+    st.session_state.job = None
+    if job.status == "done":
+        result = job.result
+        st.session_state.parsed_info = job.parsed_info
+        st.session_state.parameter_rows = build_parameter_rows(
+            hashlib.sha1(job.java_code.encode("utf-8")).hexdigest(), job.parsed_info)
+        st.session_state.estimate = result["estimate"]
+        st.session_state.json_example = result["json"]
+        st.session_state.json_preview = result["preview"]
+        st.session_state.json_gzip = result["gzip"]
+        st.session_state.job_message = ("success", "解析成功！")
+    elif job.status == "cancelled":
+        st.session_state.job_message = ("warning", "已取消生成")
+    else:
+        st.session_state.job_message = ("error", f"解析失败：{job.error}")
+
+
+@st.fragment(run_every=0.5)
+def show_job_progress():
+    """定时刷新后台任务进度，任务结束后触发整页重新运行"""
+    job = st.session_state.get("job")
+    if job is None:
+        return
+    if job.done:
+        finish_job(job)
+        st.rerun()
 
-def parse_and_generate(java_code: str) -> tuple[bool, Dict[str, Any], str]:
-    """解析 Java 代码并生成 JSON 示例"""
-    try:
-        # 解析 Java 代码
-        parser = JavaEntityParser(java_code)
-        parsed_info = parser.get_parsed_info()
+    if job.status == "pending":
+        st.progress(0.0, text="排队等待中...")
+    else:
+        st.progress(job.progress, text=f"已解析 {job.classes_parsed} 个类，"
+                                       f"已生成 {job.records_generated}/{job.record_count} 条记录")
+    if st.button("取消生成"):
+        job.cancel()
 
-        # 生成 JSON 示例
-        generator = JsonGenerator(parsed_info)
-        json_example = generator.to_json(indent=2)
 
-        return True, parsed_info, json_example
-    except Exception as e:
-        return False, {}, str(e)
+def show_estimate(estimate: OutputEstimate):
+    """显示输出规模预估"""
+    col1, col2, col3 = st.columns(3)
+    col1.metric("预估值个数", f"{estimate.expected_values:,}")
+    col2.metric("预估大小", f"{estimate.expected_bytes / 1024:,.1f} KB")
+    col3.metric("预估耗时", f"{estimate.expected_seconds:.2f} s")
 
 
 class ParameterAnalyzer:
@@ -361,55 +413,53 @@ class ParameterAnalyzer:
         return result
 
 
-def show_parameter_list(parsed_info: Dict[str, Any]):
+@st.cache_data(max_entries=64)
+def build_parameter_rows(input_hash: str, _parsed_info: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """按输入代码的哈希缓存参数列表，没有类时返回 None"""
+    if not _parsed_info["classes"]:
+        return None
+    analyzer = ParameterAnalyzer(_parsed_info)
+    # 显示第一个类
+    return analyzer.build_parameter_list(_parsed_info["classes"][0])
+
+
+def show_parameter_list(parameters: Optional[List[Dict[str, Any]]]):
     """显示参数列表"""
-    if not parsed_info["classes"]:
+    if parameters is None:
         st.warning("未检测到类信息，请先输入Java代码")
         return
 
-    analyzer = ParameterAnalyzer(parsed_info)
-
-    # 类选择器
-    selected_class = [cls["name"] for cls in parsed_info["classes"]][0]
-
-    # 显示类的基本信息
-    class_info = analyzer.find_class_info(selected_class)
-    if class_info:
-        # 构建参数列表
-        parameters = analyzer.build_parameter_list(class_info)
-        if parameters:
-            df = pd.DataFrame(parameters)
-
-            # 使用 Streamlit 的表格组件显示
-            st.dataframe(
-                df,
-                column_config={
-                    "字段名": st.column_config.TextColumn(
-                        "字段名",
-                        help="字段的完整路径",
-                        width="medium"
-                    ),
-                    "类型": st.column_config.TextColumn(
-                        "类型",
-                        help="字段的类型",
-                        width="medium"
-                    ),
-                    "是否必填": st.column_config.TextColumn(
-                        "是否必填",
-                        help="是否必填",
-                        width="small"
-                    ),
-                    "备注": st.column_config.TextColumn(
-                        "备注",
-                        help="备注",
-                        width="medium"
-                    )
-                },
-                hide_index=True,
-                use_container_width=True
-            )
-        else:
-            st.info("该类没有字段")
+    if parameters:
+        # 直接传入缓存的行，不在每次重新运行时构建 DataFrame
+        st.dataframe(
+            parameters,
+            column_config={
+                "字段名": st.column_config.TextColumn(
+                    "字段名",
+                    help="字段的完整路径",
+                    width="medium"
+                ),
+                "类型": st.column_config.TextColumn(
+                    "类型",
+                    help="字段的类型",
+                    width="medium"
+                ),
+                "是否必填": st.column_config.TextColumn(
+                    "是否必填",
+                    help="是否必填",
+                    width="small"
+                ),
+                "备注": st.column_config.TextColumn(
+                    "备注",
+                    help="备注",
+                    width="medium"
+                )
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    else:
+        st.info("该类没有字段")
 
 
 def main():
@@ -434,20 +484,30 @@ def main():
             key="java_code"
         )
 
-        # 解析按钮
-        if st.button("生成 JSON 示例", type="primary"):
+        # 集合大小与记录数配置
+        size_col1, size_col2, size_col3 = st.columns(3)
+        collection_size = size_col1.number_input("集合元素个数", min_value=0, max_value=100000, value=1)
+        map_size = size_col2.number_input("Map 键值对个数", min_value=0, max_value=100000, value=1)
+        record_count = size_col3.number_input("记录数", min_value=1, max_value=1000000, value=1)
+
+        # 解析按钮，同一会话同时只允许一个任务
+        running = st.session_state.get("job") is not None
+        if st.button("生成 JSON 示例", type="primary", disabled=running):
             if not java_code.strip():
                 st.error("请输入 Java 代码！")
                 return
 
-            success, parsed_info, json_example = parse_and_generate(java_code)
+            st.session_state.job_message = None
+            st.session_state.job = start_job(java_code, int(collection_size), int(map_size), int(record_count))
+            running = True
 
-            if success:
-                st.session_state.parsed_info = parsed_info
-                st.session_state.json_example = json_example
-                st.success("解析成功！")
-            else:
-                st.error(f"解析失败：{json_example}")
+        if running:
+            show_job_progress()
+
+        message = st.session_state.get("job_message")
+        if message:
+            level, text = message
+            getattr(st, level)(text)
 
     with right_col:
         st.markdown("### 🔍 解析结果")
@@ -456,16 +516,21 @@ def main():
         tab1, tab2 = st.tabs(["JSON示例", "表格形式"])
 
         with tab1:
-            if "json_example" in st.session_state:
-                # 格式化 JSON
-                formatted_json = json.dumps(
-                    json.loads(st.session_state.json_example),
-                    indent=4,
-                    ensure_ascii=False
-                )
+            if "estimate" in st.session_state:
+                show_estimate(st.session_state.estimate)
 
-                # 使用 st.code() 显示 JSON，自带复制功能
-                st.code(formatted_json, language="json")
+            if st.session_state.get("json_gzip"):
+                st.info("预估输出超出内存限制，已切换为流式生成，下载文件为 gzip 压缩格式")
+                st.code(st.session_state.json_preview + "\n...", language="json")
+                st.download_button(
+                    label="下载 JSON 文件（gzip）",
+                    data=st.session_state.json_gzip,
+                    file_name="example.json.gz",
+                    mime="application/gzip"
+                )
+            elif st.session_state.get("json_example"):
+                # 使用 st.code() 显示 JSON，自带复制功能；生成时已格式化，无需重新序列化
+                st.code(st.session_state.json_example, language="json")
 
                 # 下载按钮
                 st.download_button(
@@ -476,18 +541,11 @@ def main():
                 )
 
         with tab2:
-            if "parsed_info" in st.session_state:
-                show_parameter_list(st.session_state.parsed_info)
+            if "parameter_rows" in st.session_state:
+                show_parameter_list(st.session_state.parameter_rows)
     # 添加页脚
     st.markdown("---")
-    st.markdown("""
-            <div class="footer">
-                <p style="margin: 0;">Made with ❤️ by damao</p>
-                <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem;">
-                    ⭐ 支持多重嵌套泛型 | 🎯 完整枚举解析 | 🔄 数组类型支持
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
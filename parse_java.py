@@ -70,6 +70,14 @@ class ClassInfo:
             self.implements = []
 
 
+def find_annotation(annotations: List[Dict[str, Any]], name: str) -> Optional[Dict[str, Any]]:
+    """按名称查找解析结果中的注解"""
+    for ann in annotations or []:
+        if ann['name'] == name:
+            return ann
+    return None
+
+
 class JavaEntityParser:
     PRIMITIVE_TYPES = {
         'byte', 'short', 'int', 'long', 'float', 'double', 'boolean', 'char',
@@ -90,6 +98,18 @@ class JavaEntityParser:
         self.enums: List[EnumInfo] = []
         self.parse()
 
+    def _parse_annotation_value(self, value) -> Any:
+        """解析注解参数值"""
+        if hasattr(value, 'value'):
+            return value.value
+        if hasattr(value, 'values'):
+            return [self._parse_annotation_value(v) for v in value.values]
+        if hasattr(value, 'members'):
+            return [m.value for m in value.members]
+        if isinstance(value, javalang.tree.MemberReference):
+            return f"{value.qualifier}.{value.member}" if value.qualifier else value.member
+        return str(value)
+
     def _parse_annotations(self, node) -> List[Dict[str, Any]]:
         """解析注解信息"""
         annotations = []
@@ -99,15 +119,13 @@ class JavaEntityParser:
                     'name': ann.name,
                     'parameters': {}
                 }
-                if ann.element is not None and hasattr(ann.element, 'pairs'):
-                    for pair in ann.element.pairs:
-                        if hasattr(pair.value, 'value'):
-                            value = pair.value.value
-                        elif hasattr(pair.value, 'members'):
-                            value = [m.value for m in pair.value.members]
-                        else:
-                            value = str(pair.value)
-                        annotation['parameters'][pair.name] = value
+                # 具名参数为 ElementValuePair 列表，单个参数等价于 value=...
+                pairs = ann.element if isinstance(ann.element, list) else getattr(ann.element, 'pairs', None)
+                if pairs:
+                    for pair in pairs:
+                        annotation['parameters'][pair.name] = self._parse_annotation_value(pair.value)
+                elif ann.element is not None:
+                    annotation['parameters']['value'] = self._parse_annotation_value(ann.element)
                 annotations.append(annotation)
         return annotations
 
@@ -0,0 +1,291 @@
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from generate_json import ARRAY, COLLECTION, MAP, OBJECT, JsonGenerator, Projection
+from parse_java import find_annotation
+
+
+def _lower_first(name: str) -> str:
+    return name[:1].lower() + name[1:]
+
+
+@dataclass
+class Reference:
+    class_name: str   # 持有外键的类
+    field_name: str   # 外键字段
+    target: str       # 被引用的类
+    nested: bool      # 字段是嵌套对象（设置其 @Id）还是直接保存键值
+
+
+class ReservoirSample:
+    """蓄水池抽样：只保留固定数量的键，每个已生成的键被保留的概率相同"""
+
+    def __init__(self, capacity: int, rng: random.Random):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.rng = rng
+        self.items: List[Any] = []
+        self.seen = 0
+
+    def add(self, item: Any):
+        self.seen += 1
+        if len(self.items) < self.capacity:
+            self.items.append(item)
+        else:
+            index = self.rng.randrange(self.seen)
+            if index < self.capacity:
+                self.items[index] = item
+
+    def choice(self) -> Any:
+        return self.rng.choice(self.items) if self.items else None
+
+
+class RelationalGenerator:
+    """多实体生成：按依赖顺序先生成被引用的实体，子实体的外键从其键样本中抽取"""
+
+    def __init__(self, parsed_info: Dict[str, Any], counts: Dict[str, int],
+                 references: Optional[Dict[str, str]] = None, pool_size: int = 10000,
+                 seed: Optional[int] = None, generator: Optional[JsonGenerator] = None):
+        """
+        counts: 每个实体要生成的记录数
+        references: 显式配置的外键，格式为 {"类名.字段名": "被引用的类名"}
+        pool_size: 每个被引用实体保留的键样本数量
+        """
+        self.parsed_info = parsed_info
+        self.counts = counts
+        self.generator = generator or JsonGenerator(parsed_info)
+        self.classes = {cls['name']: cls for cls in parsed_info['classes']}
+        self.id_fields = self._find_id_fields()
+        self.references: Dict[str, List[Reference]] = defaultdict(list)
+        for reference in self._detect_references(references or {}):
+            self.references[reference.class_name].append(reference)
+        self.rng = random.Random(seed)
+        self.pool_size = pool_size
+        self.pools: Dict[str, ReservoirSample] = {}
+        self.projections: Dict[str, Optional[Projection]] = {}
+
+        for class_name in counts:
+            if class_name not in self.classes:
+                raise ValueError(f"Unknown class: {class_name}")
+        self.order = self._dependency_order()
+
+    def _find_id_fields(self) -> Dict[str, str]:
+        """每个类的 @Id 字段"""
+        id_fields = {}
+        for class_name, class_info in self.classes.items():
+            for field in class_info['fields']:
+                if find_annotation(field['annotations'], 'Id'):
+                    id_fields[class_name] = field['name']
+                    break
+        return id_fields
+
+    def _field(self, class_name: str, field_name: str) -> Optional[Dict[str, Any]]:
+        for field in self.classes[class_name]['fields']:
+            if field['name'] == field_name:
+                return field
+        return None
+
+    def _detect_references(self, configured: Dict[str, str]) -> List[Reference]:
+        """根据 @ManyToOne / @OneToMany 注解及显式配置识别外键"""
+        found: Dict[Tuple[str, str], Reference] = {}
+        for class_name, class_info in self.classes.items():
+            for field in class_info['fields']:
+                annotations = field['annotations']
+                if find_annotation(annotations, 'ManyToOne') and field['type'] in self.classes:
+                    found[(class_name, field['name'])] = Reference(class_name, field['name'], field['type'], True)
+
+                one_to_many = find_annotation(annotations, 'OneToMany')
+                generic = field.get('genericInfo')
+                if not one_to_many or not generic or not generic['typeArguments']:
+                    continue
+                child = generic['typeArguments'][0]
+                if not isinstance(child, str) or child not in self.classes:
+                    continue
+                # 优先使用 mappedBy 指定的反向字段，其次查找类型为父类或名为 xxxId 的字段
+                mapped_by = str(one_to_many['parameters'].get('mappedBy', '')).strip('"')
+                candidates = [mapped_by] if mapped_by else []
+                candidates += [f['name'] for f in self.classes[child]['fields'] if f['type'] == class_name]
+                candidates.append(f"{_lower_first(class_name)}Id")
+                for candidate in candidates:
+                    child_field = self._field(child, candidate)
+                    if child_field is not None:
+                        found.setdefault((child, candidate), Reference(
+                            child, candidate, class_name, child_field['type'] == class_name))
+                        break
+
+        for path, target in configured.items():
+            class_name, _, field_name = path.partition('.')
+            field = self._field(class_name, field_name) if class_name in self.classes else None
+            if field is None:
+                raise ValueError(f"Unknown reference field: {path}")
+            if target not in self.classes:
+                raise ValueError(f"Unknown referenced class: {target}")
+            found[(class_name, field_name)] = Reference(class_name, field_name, target, field['type'] == target)
+
+        for reference in found.values():
+            if reference.target not in self.id_fields:
+                raise ValueError(f"Referenced entity {reference.target} has no @Id field")
+        return list(found.values())
+
+    def _embedded_fields(self, class_name: str) -> Iterator[Tuple[str, tuple]]:
+        """类的计划中可能包含嵌入对象的字段，跳过作为外键的嵌套对象"""
+        skipped = {ref.field_name for ref in self.references.get(class_name, ()) if ref.nested}
+        for field_name, node in self.generator.plans[class_name]:
+            if field_name not in skipped:
+                yield field_name, node
+
+    @staticmethod
+    def _node_classes(node: tuple) -> Iterator[str]:
+        """节点（穿过集合、数组和 Map）中包含的类"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current[0] == OBJECT:
+                yield current[1]
+            elif current[0] in (COLLECTION, ARRAY):
+                stack.append(current[1])
+            elif current[0] == MAP:
+                stack.append(current[2])
+
+    def _children(self, class_name: str) -> Iterator[str]:
+        """类中嵌入的其他类"""
+        for _, node in self._embedded_fields(class_name):
+            yield from self._node_classes(node)
+
+    def _projection(self, class_name: str) -> Optional[Projection]:
+        """
+        去掉所有作为外键的嵌套对象的投影：这些对象只会被替换为 {@Id 字段: 键}，
+        不需要生成，也不应消耗被引用实体的 @Id 分配器
+        """
+        if class_name in self.projections:
+            return self.projections[class_name]
+        exclude = []
+        stack = [(class_name, '', (class_name,))]
+        while stack:
+            current, prefix, path = stack.pop()
+            nested = {ref.field_name for ref in self.references.get(current, ()) if ref.nested}
+            for field_name, node in self.generator.plans[current]:
+                if field_name in nested:
+                    exclude.append(prefix + field_name)
+                    continue
+                for child in set(self._node_classes(node)):
+                    limit = self.generator.cycle_limits.get(child)
+                    if limit is not None and path.count(child) >= limit:
+                        continue
+                    stack.append((child, f"{prefix}{field_name}.", path + (child,)))
+        projection = Projection(exclude=sorted(set(exclude))) if exclude else None
+        self.projections[class_name] = projection
+        return projection
+
+    @staticmethod
+    def _embedded_objects(value: Any, node: tuple) -> Iterator[Tuple[Dict[str, Any], str]]:
+        """按节点结构找出值中的嵌入对象及其类名"""
+        stack = [(value, node)]
+        while stack:
+            current, current_node = stack.pop()
+            kind = current_node[0]
+            if kind == OBJECT and isinstance(current, dict):
+                yield current, current_node[1]
+            elif kind in (COLLECTION, ARRAY) and isinstance(current, list):
+                stack.extend((item, current_node[1]) for item in current)
+            elif kind == MAP and isinstance(current, dict):
+                stack.extend((item, current_node[2]) for item in current.values())
+
+    def _dependencies(self, class_name: str) -> Set[str]:
+        """生成一个实体所依赖的其他实体：包括嵌入对象上的外键，引用祖先对象的除外"""
+        dependencies = set()
+        stack = [(class_name, (class_name,))]
+        while stack:
+            current, path = stack.pop()
+            for reference in self.references.get(current, ()):
+                if reference.target not in path[:-1] and reference.target != class_name:
+                    dependencies.add(reference.target)
+            for child in self._children(current):
+                limit = self.generator.cycle_limits.get(child)
+                if limit is not None and path.count(child) >= limit:
+                    continue
+                stack.append((child, path + (child,)))
+        return dependencies
+
+    def _dependency_order(self) -> List[str]:
+        """拓扑排序：被引用的实体先生成"""
+        dependencies = {name: self._dependencies(name) for name in self.counts}
+        for name, targets in dependencies.items():
+            for target in targets:
+                if not self.counts.get(target):
+                    raise ValueError(f"{name} references {target}, but no {target} records are configured")
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1: 访问中, 2: 已完成
+        for root in self.counts:
+            if state.get(root) == 2:
+                continue
+            stack = [(root, iter(sorted(dependencies[root])))]
+            state[root] = 1
+            while stack:
+                node, targets = stack[-1]
+                for target in targets:
+                    if state.get(target) == 1:
+                        raise ValueError(f"Circular references between entities: {node} -> {target}")
+                    if state.get(target) is None:
+                        state[target] = 1
+                        stack.append((target, iter(sorted(dependencies[target]))))
+                        break
+                else:
+                    stack.pop()
+                    state[node] = 2
+                    order.append(node)
+        return order
+
+    def _resolve(self, record: Dict[str, Any], class_name: str):
+        """为记录及其嵌入对象填充外键：优先引用所属的祖先对象，否则从键样本中抽取"""
+        stack = [(record, class_name, ())]
+        while stack:
+            value, current, ancestors = stack.pop()
+            if not isinstance(value, dict) or not value:
+                continue
+            reordered = False
+            for reference in self.references.get(current, ()):
+                key = None
+                for ancestor_class, ancestor_key in reversed(ancestors):
+                    if ancestor_class == reference.target:
+                        key = ancestor_key
+                        break
+                else:
+                    pool = self.pools.get(reference.target)
+                    key = pool.choice() if pool else None
+                if reference.nested:
+                    # 嵌套对象只保留键，其余字段（包括它自己的外键）无法保证指向已生成的记录
+                    value[reference.field_name] = None if key is None else {self.id_fields[reference.target]: key}
+                    reordered = True
+                else:
+                    value[reference.field_name] = key
+
+            if reordered:
+                # 被投影去掉的字段追加在末尾，恢复声明顺序
+                fields = [(name, value[name]) for name, _ in self.generator.plans[current] if name in value]
+                value.clear()
+                value.update(fields)
+
+            id_field = self.id_fields.get(current)
+            ancestors = ancestors + ((current, value.get(id_field) if id_field else None),)
+            for field_name, node in self._embedded_fields(current):
+                for child_value, child in self._embedded_objects(value.get(field_name), node):
+                    stack.append((child_value, child, ancestors))
+
+    def generate(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """按依赖顺序逐条生成 (类名, 记录)，内存只保留各实体的键样本"""
+        targets = {reference.target for refs in self.references.values() for reference in refs}
+        for class_name in self.order:
+            pool = None
+            if class_name in targets:
+                pool = self.pools[class_name] = ReservoirSample(self.pool_size, self.rng)
+            id_field = self.id_fields.get(class_name)
+            for _ in range(self.counts[class_name]):
+                record = self.generator.generate_example(class_name, projection=self._projection(class_name))
+                self._resolve(record, class_name)
+                if pool is not None:
+                    pool.add(record[id_field])
+                yield class_name, record
@@ -0,0 +1,243 @@
+import bz2
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from binary_formats import PlanEncoder
+from generate_json import OBJECT, JsonGenerator, Projection
+
+MANIFEST_NAME = 'manifest.json'
+
+# 交给压缩线程前累积的字节数
+CHUNK_SIZE = 1 << 16
+
+EXTENSIONS = {'jsonl': 'jsonl', 'msgpack': 'msgpack', 'cbor': 'cbor'}
+COMPRESSIONS = {None: '', 'gzip': '.gz', 'bz2': '.bz2'}
+
+
+@dataclass
+class ShardInfo:
+    file: str
+    records: int = 0
+    bytes: int = 0             # 压缩前的字节数
+    compressed_bytes: int = 0  # 磁盘上的字节数
+    sha256: str = ''           # 磁盘上文件的校验和
+
+
+class _HashingFile:
+    """写入时同步计算 sha256 和字节数的文件包装"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'wb')
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ShardedWriter:
+    """按记录数或字节数轮转分片的输出器；压缩和写盘在单独的线程中进行"""
+
+    def __init__(self, output_dir: str, fmt: str = 'jsonl', compression: Optional[str] = None,
+                 max_records: Optional[int] = None, max_bytes: Optional[int] = None,
+                 prefix: str = 'part', encoder: Optional[PlanEncoder] = None, queue_size: int = 64):
+        """
+        fmt: jsonl / msgpack / cbor，二进制格式需要传入对应的 PlanEncoder
+        max_bytes: 按压缩前的字节数轮转，单条记录不会被拆分到两个分片
+        """
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unknown format: {fmt}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if fmt != 'jsonl' and (encoder is None or encoder.format.name != fmt):
+            raise ValueError(f"Format {fmt} requires a matching PlanEncoder")
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.compression = compression
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.encoder = encoder
+        self.shards: List[ShardInfo] = []
+        self._current: Optional[ShardInfo] = None
+        self._buffer = bytearray()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        os.makedirs(output_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._drain, name='shard-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'ShardedWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _encode(self, record: Any, class_name: Optional[str]) -> bytes:
+        if self.fmt == 'jsonl':
+            return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        out = bytearray()
+        self.encoder.encode(record, (OBJECT, class_name) if class_name else None, out)
+        return bytes(out)
+
+    def _put(self, item):
+        """放入队列；写线程出错时不再阻塞"""
+        while True:
+            if self._error is not None:
+                raise self._error
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _flush(self):
+        if self._buffer:
+            self._put(('data', self._current, bytes(self._buffer)))
+            self._buffer.clear()
+
+    def _rotate(self):
+        """结束当前分片，下一条记录写入新分片"""
+        if self._current is None:
+            return
+        self._flush()
+        self._put(('close', self._current, None))
+        self._current = None
+
+    def _open(self):
+        name = f"{self.prefix}-{len(self.shards):05d}.{EXTENSIONS[self.fmt]}{COMPRESSIONS[self.compression]}"
+        self._current = ShardInfo(name)
+        self.shards.append(self._current)
+        self._put(('open', self._current, None))
+
+    def write(self, record: Any, class_name: Optional[str] = None):
+        """写入一条记录；二进制格式传入 class_name 时按类计划编码"""
+        if self._closed:
+            raise ValueError("Writer is closed")
+        data = self._encode(record, class_name)
+        current = self._current
+        if current is not None and (
+                (self.max_records is not None and current.records >= self.max_records)
+                or (self.max_bytes is not None and current.records and current.bytes + len(data) > self.max_bytes)):
+            self._rotate()
+        if self._current is None:
+            self._open()
+        self._current.records += 1
+        self._current.bytes += len(data)
+        self._buffer += data
+        if len(self._buffer) >= CHUNK_SIZE:
+            self._flush()
+
+    def _drain(self):
+        """写线程：按顺序处理打开、写入、关闭分片"""
+        file = raw = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                action, shard, data = item
+                if action == 'open':
+                    raw = _HashingFile(os.path.join(self.output_dir, shard.file))
+                    if self.compression == 'gzip':
+                        file = gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+                    elif self.compression == 'bz2':
+                        file = bz2.BZ2File(raw, 'wb')
+                    else:
+                        file = raw
+                elif action == 'data':
+                    file.write(data)
+                else:
+                    if file is not raw:
+                        file.close()
+                    raw.close()
+                    shard.compressed_bytes = raw.size
+                    shard.sha256 = raw.digest.hexdigest()
+                    file = raw = None
+        except BaseException as e:
+            # 记录错误后直接退出；生产者在 _put 中检查到错误不会再阻塞，close 也不再等待结束标记
+            self._error = e
+        finally:
+            if raw is not None:
+                raw.close()
+
+    def close(self) -> Dict[str, Any]:
+        """写完所有分片并生成清单，返回清单内容"""
+        if not self._closed:
+            self._closed = True
+            try:
+                self._rotate()
+                self._put(None)
+            finally:
+                self._thread.join()
+        if self._error is not None:
+            raise self._error
+        manifest = self.manifest()
+        with open(os.path.join(self.output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def manifest(self) -> Dict[str, Any]:
+        return {
+            "format": self.fmt,
+            "compression": self.compression,
+            "records": sum(shard.records for shard in self.shards),
+            "bytes": sum(shard.bytes for shard in self.shards),
+            "compressed_bytes": sum(shard.compressed_bytes for shard in self.shards),
+            "shards": [asdict(shard) for shard in self.shards]
+        }
+
+
+def write_shards(generator: JsonGenerator, output_dir: str, count: int, class_name: Optional[str] = None,
+                 fmt: str = 'jsonl', projection: Union[Projection, Iterable[str], None] = None,
+                 **kwargs) -> Dict[str, Any]:
+    """生成 count 条记录写入分片目录，返回清单；projection 为只生成的字段路径"""
+    class_name = generator.resolve_class_name(class_name)
+    if class_name is None:
+        raise ValueError("No class to generate")
+    encoder = PlanEncoder(generator, fmt) if fmt != 'jsonl' else None
+    with ShardedWriter(output_dir, fmt=fmt, encoder=encoder, **kwargs) as writer:
+        for _ in range(count):
+            writer.write(generator.generate_example(class_name, projection=projection), class_name)
+    return writer.manifest()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from parse_java import JavaEntityParser
+
+    arg_parser = argparse.ArgumentParser(description="批量生成数据并按分片写出")
+    arg_parser.add_argument("source", help="Java 源文件路径")
+    arg_parser.add_argument("output_dir", help="输出目录")
+    arg_parser.add_argument("--class", dest="class_name", help="要生成的类名，默认第一个类")
+    arg_parser.add_argument("--count", type=int, default=10000, help="记录数")
+    arg_parser.add_argument("--format", dest="fmt", choices=sorted(EXTENSIONS), default="jsonl")
+    arg_parser.add_argument("--compression", choices=["gzip", "bz2"])
+    arg_parser.add_argument("--max-records", type=int, help="每个分片的最大记录数")
+    arg_parser.add_argument("--max-bytes", type=int, help="每个分片压缩前的最大字节数")
+    arg_parser.add_argument("--field", dest="fields", action="append", help="只生成的字段路径，可多次指定，如 orders[].status")
+    args = arg_parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        info = JavaEntityParser(f.read()).get_parsed_info()
+    result = write_shards(JsonGenerator(info), args.output_dir, args.count, args.class_name, fmt=args.fmt,
+                          projection=args.fields, compression=args.compression, max_records=args.max_records,
+                          max_bytes=args.max_bytes)
+    print(f"{result['records']} records, {len(result['shards'])} shards, "
+          f"{result['bytes']:,} bytes -> {result['compressed_bytes']:,} bytes")
@@ -0,0 +1,314 @@
+import itertools
+import json
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from generate_json import JsonGenerator
+from parse_java import find_annotation
+
+# Java 类型到 SQLite 列类型的映射
+SQLITE_TYPES = {
+    'byte': 'INTEGER', 'Byte': 'INTEGER', 'short': 'INTEGER', 'Short': 'INTEGER',
+    'int': 'INTEGER', 'Integer': 'INTEGER', 'long': 'INTEGER', 'Long': 'INTEGER',
+    'BigInteger': 'INTEGER', 'boolean': 'INTEGER', 'Boolean': 'INTEGER',
+    'float': 'REAL', 'Float': 'REAL', 'double': 'REAL', 'Double': 'REAL',
+    'BigDecimal': 'NUMERIC',
+    'char': 'TEXT', 'Character': 'TEXT', 'String': 'TEXT',
+    'Date': 'TEXT', 'LocalDate': 'TEXT', 'LocalDateTime': 'TEXT'
+}
+
+
+def _snake_case(name: str) -> str:
+    """驼峰命名转下划线命名"""
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+@dataclass
+class ColumnInfo:
+    name: str
+    field_name: Optional[str]
+    sql_type: str
+    is_json: bool = False
+
+
+@dataclass
+class ChildLink:
+    field_name: str
+    table: 'TableInfo'
+    many: bool
+    fk_index: int  # many=True 时为子表中的外键列位置，否则为父表中的外键列位置
+
+
+@dataclass
+class TableInfo:
+    name: str
+    class_name: str
+    columns: List[ColumnInfo]
+    pk_index: int
+    children: List[ChildLink] = field(default_factory=list)
+
+    @property
+    def pk_is_integer(self) -> bool:
+        return self.columns[self.pk_index].sql_type == 'INTEGER'
+
+
+class SqliteFixtureLoader:
+    """根据解析出的实体类生成数据并批量写入 SQLite"""
+
+    def __init__(self, parsed_info: Dict[str, Any], db_path: str = ':memory:',
+                 batch_size: int = 1000, generator: Optional[JsonGenerator] = None,
+                 fast: bool = True):
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.parsed_info = parsed_info
+        self.batch_size = batch_size
+        self.generator = generator or JsonGenerator(parsed_info)
+        self.classes = {cls['name']: cls for cls in parsed_info['classes']}
+        self.enums = {enum['name'] for enum in parsed_info['enums']}
+        self.tables: Dict[str, TableInfo] = {}
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        if fast:
+            # 数据仅用于本地测试，关闭日志与同步以换取写入速度
+            self.conn.execute("PRAGMA journal_mode = MEMORY")
+            self.conn.execute("PRAGMA synchronous = OFF")
+
+    def _is_entity(self, class_info: Dict[str, Any]) -> bool:
+        return find_annotation(class_info['annotations'], 'Entity') is not None
+
+    def _table_name(self, class_info: Dict[str, Any], prefix: str = '') -> str:
+        """根据 @Table 注解或类名确定表名"""
+        table = find_annotation(class_info['annotations'], 'Table')
+        if table and table['parameters'].get('name'):
+            return table['parameters']['name'].strip('"')
+        if prefix and not self._is_entity(class_info):
+            return prefix
+        return _snake_case(class_info['name'])
+
+    def _column_name(self, field_info: Dict[str, Any]) -> str:
+        """根据 @Column 注解或字段名确定列名"""
+        column = find_annotation(field_info['annotations'], 'Column')
+        if column and column['parameters'].get('name'):
+            return column['parameters']['name'].strip('"')
+        return _snake_case(field_info['name'])
+
+    def _element_class(self, field_info: Dict[str, Any]) -> Optional[str]:
+        """返回集合元素类型对应的已知类名"""
+        generic = field_info.get('genericInfo')
+        if field_info['fieldType'] != 'collection' or not generic or not generic['typeArguments']:
+            return None
+        element = generic['typeArguments'][0]
+        if isinstance(element, str) and element in self.classes:
+            return element
+        return None
+
+    def _build_table(self, class_name: str, prefix: str, path: List[str]) -> TableInfo:
+        """构建单个类对应的表结构，嵌套对象与 @OneToMany 集合映射为子表"""
+        class_info = self.classes[class_name]
+        name = self._table_name(class_info, prefix)
+        if name in self.tables:
+            return self.tables[name]
+
+        columns: List[ColumnInfo] = []
+        pk_index = -1
+        nested = []
+        for field_info in class_info['fields']:
+            annotations = field_info['annotations']
+            if find_annotation(annotations, 'Transient') or 'static' in field_info['modifiers']:
+                continue
+            type_name = field_info['type']
+            if field_info['fieldType'] == 'custom' and type_name in self.classes and not field_info['isArray']:
+                nested.append((field_info, type_name, False))
+                continue
+            element_class = self._element_class(field_info)
+            if element_class:
+                nested.append((field_info, element_class, True))
+                continue
+
+            if field_info['isArray'] or field_info['fieldType'] in ('collection', 'map', 'custom'):
+                columns.append(ColumnInfo(self._column_name(field_info), field_info['name'], 'TEXT', True))
+            elif field_info['fieldType'] == 'enum' or type_name in self.enums:
+                columns.append(ColumnInfo(self._column_name(field_info), field_info['name'], 'TEXT'))
+            else:
+                columns.append(ColumnInfo(self._column_name(field_info), field_info['name'],
+                                          SQLITE_TYPES.get(type_name, 'TEXT')))
+            if pk_index < 0 and find_annotation(annotations, 'Id'):
+                pk_index = len(columns) - 1
+
+        if pk_index < 0:
+            # 没有 @Id 时使用代理主键
+            pk_name = '_id' if any(col.name == 'id' for col in columns) else 'id'
+            columns.insert(0, ColumnInfo(pk_name, None, 'INTEGER'))
+            pk_index = 0
+        elif columns[pk_index].sql_type not in ('INTEGER', 'TEXT'):
+            columns[pk_index].sql_type = 'TEXT'
+
+        table = TableInfo(name=name, class_name=class_name, columns=columns, pk_index=pk_index)
+        self.tables[name] = table
+
+        path = path + [class_name]
+        for field_info, target, many in nested:
+            # 与生成器保持一致：循环引用的类不再展开
+            if target in path:
+                continue
+            child = self._build_table(target, f"{name}_{self._column_name(field_info)}", path)
+            if many:
+                # 同一父表的多个集合指向同一子表时，外键列按字段区分
+                pk_column = table.columns[table.pk_index]
+                fk_name = f"{name}_{pk_column.name}"
+                if any(column.name == fk_name for column in child.columns):
+                    fk_name = f"{name}_{self._column_name(field_info)}_{pk_column.name}"
+                child.columns.append(ColumnInfo(fk_name, None, pk_column.sql_type))
+                table.children.append(ChildLink(field_info['name'], child, True, len(child.columns) - 1))
+            else:
+                table.columns.append(ColumnInfo(f"{self._column_name(field_info)}_id", None,
+                                                child.columns[child.pk_index].sql_type))
+                table.children.append(ChildLink(field_info['name'], child, False, len(table.columns) - 1))
+        return table
+
+    def build_schema(self, class_name: str) -> TableInfo:
+        """从根类出发构建表结构"""
+        if class_name not in self.classes:
+            raise ValueError(f"Unknown class: {class_name}")
+        return self._build_table(class_name, '', [])
+
+    def _create_tables(self):
+        """创建表；表已存在时补上之后加入的外键列（例如从另一个根类加载时）"""
+        for table in self.tables.values():
+            existing = {row[1] for row in self.conn.execute(f'PRAGMA table_info("{table.name}")')}
+            if not existing:
+                column_defs = []
+                for index, column in enumerate(table.columns):
+                    definition = f'"{column.name}" {column.sql_type}'
+                    if index == table.pk_index:
+                        definition += ' PRIMARY KEY'
+                    column_defs.append(definition)
+                self.conn.execute(f'CREATE TABLE "{table.name}" ({", ".join(column_defs)})')
+                continue
+            if table.columns[table.pk_index].name not in existing:
+                raise ValueError(f"Table {table.name} already exists with a different primary key")
+            for column in table.columns:
+                if column.name not in existing:
+                    self.conn.execute(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column.sql_type}')
+
+    def _insert_sql(self, table: TableInfo) -> str:
+        columns = ', '.join(f'"{column.name}"' for column in table.columns)
+        placeholders = ', '.join('?' * len(table.columns))
+        return f'INSERT INTO "{table.name}" ({columns}) VALUES ({placeholders})'
+
+    def _next_keys(self) -> Dict[str, Any]:
+        """为每张表创建主键序列，续接表中已有的最大主键"""
+        keys = {}
+        for table in self.tables.values():
+            pk_name = table.columns[table.pk_index].name
+            if table.pk_is_integer:
+                start = self.conn.execute(f'SELECT COALESCE(MAX("{pk_name}"), 0) FROM "{table.name}"').fetchone()[0]
+            else:
+                start = self.conn.execute(f'SELECT COUNT(*) FROM "{table.name}"').fetchone()[0]
+            keys[table.name] = itertools.count(start + 1)
+        return keys
+
+    def _flatten(self, root: TableInfo, obj: Dict[str, Any], keys: Dict[str, Any],
+                 buffers: Dict[str, List[tuple]]):
+        """将一条生成的对象拆分为各表的行"""
+        stack = [(root, obj, next(keys[root.name]), -1, None)]
+        while stack:
+            table, data, pk, fk_index, fk_value = stack.pop()
+            if not table.pk_is_integer:
+                pk = str(pk)
+            row: List[Any] = [None] * len(table.columns)
+            for index, column in enumerate(table.columns):
+                if column.field_name is None:
+                    continue
+                value = data.get(column.field_name)
+                if column.is_json:
+                    value = json.dumps(value, ensure_ascii=False)
+                elif isinstance(value, bool):
+                    value = int(value)
+                row[index] = value
+            # 主键由加载器分配，保证批量写入时不冲突
+            row[table.pk_index] = pk
+            if fk_index >= 0:
+                row[fk_index] = fk_value
+
+            for link in table.children:
+                value = data.get(link.field_name)
+                if link.many:
+                    for item in value or []:
+                        if item:
+                            stack.append((link.table, item, next(keys[link.table.name]), link.fk_index, pk))
+                elif value:
+                    child_pk = next(keys[link.table.name])
+                    row[link.fk_index] = child_pk if link.table.pk_is_integer else str(child_pk)
+                    stack.append((link.table, value, child_pk, -1, None))
+            buffers[table.name].append(tuple(row))
+
+    def _flush(self, buffers: Dict[str, List[tuple]], statements: Dict[str, str]) -> int:
+        """在一个事务中批量写入所有缓冲的行"""
+        written = 0
+        self.conn.execute("BEGIN")
+        try:
+            for name, rows in buffers.items():
+                if rows:
+                    self.conn.executemany(statements[name], rows)
+                    written += len(rows)
+                    rows.clear()
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return written
+
+    def load(self, class_name: str, count: int) -> Dict[str, int]:
+        """生成 count 条根对象并写入数据库，返回每张表写入的行数"""
+        root = self.build_schema(class_name)
+        self._create_tables()
+        keys = self._next_keys()
+        statements = {name: self._insert_sql(table) for name, table in self.tables.items()}
+        buffers: Dict[str, List[tuple]] = {name: [] for name in self.tables}
+        counts = {name: 0 for name in self.tables}
+
+        pending = 0
+        for _ in range(count):
+            self._flatten(root, self.generator.generate_example(class_name), keys, buffers)
+            pending += 1
+            if pending >= self.batch_size:
+                for name, rows in buffers.items():
+                    counts[name] += len(rows)
+                self._flush(buffers, statements)
+                pending = 0
+        for name, rows in buffers.items():
+            counts[name] += len(rows)
+        self._flush(buffers, statements)
+        return counts
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from parse_java import JavaEntityParser
+
+    arg_parser = argparse.ArgumentParser(description="根据 Java 实体类批量生成 SQLite 测试数据")
+    arg_parser.add_argument("source", help="Java 源文件路径")
+    arg_parser.add_argument("--class", dest="class_name", help="根实体类名，默认第一个类")
+    arg_parser.add_argument("--count", type=int, default=1000, help="根对象数量")
+    arg_parser.add_argument("--db", default="fixtures.db", help="SQLite 数据库文件")
+    arg_parser.add_argument("--batch-size", type=int, default=1000, help="每个事务写入的根对象数量")
+    args = arg_parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        info = JavaEntityParser(f.read()).get_parsed_info()
+    target = args.class_name or info['classes'][0]['name']
+
+    loader = SqliteFixtureLoader(info, args.db, batch_size=args.batch_size)
+    started = time.perf_counter()
+    result = loader.load(target, args.count)
+    loader.close()
+    for table_name, rows in result.items():
+        print(f"{table_name}: {rows} rows")
+    print(f"elapsed: {time.perf_counter() - started:.2f}s")
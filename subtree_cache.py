@@ -0,0 +1,73 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class SubtreeCache:
+    """已生成子树的缓存：内存中按 LRU 淘汰，可选落盘；值为紧凑 JSON 文本"""
+
+    def __init__(self, capacity: int = 4096, directory: Optional[str] = None):
+        """
+        capacity: 内存中保留的子树个数
+        directory: 磁盘缓存目录，为空时只使用内存
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+        if self.directory:
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    text = f.read()
+            except OSError:
+                text = None
+            if text is not None:
+                self._remember(key, text)
+                self.hits += 1
+                return text
+        self.misses += 1
+        return None
+
+    def put(self, key: str, text: str):
+        self._remember(key, text)
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再替换，避免并发读到不完整的内容
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+
+    def clear(self):
+        """清空内存中的缓存，磁盘上的文件保留"""
+        with self._lock:
+            self._entries.clear()
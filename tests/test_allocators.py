@@ -0,0 +1,115 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from allocators import (ExhaustedError, PermutationAllocator, SequenceAllocator,
+                        UniqueStringAllocator, create_allocator)
+
+
+def _drain(allocator, count: int) -> list:
+    return [allocator.allocate() for _ in range(count)]
+
+
+class ShardUniquenessTest(unittest.TestCase):
+    SHARD_COUNT = 4
+
+    def _assert_disjoint(self, factory, per_shard: int):
+        values = []
+        for shard in range(self.SHARD_COUNT):
+            values.extend(_drain(factory(shard), per_shard))
+        self.assertEqual(len(values), len(set(values)))
+
+    def test_sequence_shards_do_not_overlap(self):
+        self._assert_disjoint(lambda shard: SequenceAllocator(shard=shard, shard_count=self.SHARD_COUNT), 1000)
+
+    def test_permutation_shards_do_not_overlap(self):
+        self._assert_disjoint(
+            lambda shard: PermutationAllocator(1, 1 << 31, seed=7, shard=shard, shard_count=self.SHARD_COUNT), 1000)
+
+    def test_string_shards_do_not_overlap(self):
+        self._assert_disjoint(
+            lambda shard: UniqueStringAllocator(length=3, seed=7, shard=shard, shard_count=self.SHARD_COUNT), 1000)
+
+    def test_permutation_shards_cover_small_range(self):
+        # 所有分片合起来恰好覆盖整个区间
+        values = []
+        for shard in range(self.SHARD_COUNT):
+            allocator = PermutationAllocator(10, 110, seed=3, shard=shard, shard_count=self.SHARD_COUNT)
+            values.extend(_drain(allocator, 25))
+        self.assertEqual(sorted(values), list(range(10, 110)))
+
+    def test_invalid_shard(self):
+        with self.assertRaises(ValueError):
+            SequenceAllocator(shard=2, shard_count=2)
+        with self.assertRaises(ValueError):
+            PermutationAllocator(0, 10, shard=-1, shard_count=2)
+
+
+class ExhaustionTest(unittest.TestCase):
+    def test_permutation_exhausts_after_range(self):
+        allocator = PermutationAllocator(1, 128)
+        values = _drain(allocator, 127)
+        self.assertEqual(sorted(values), list(range(1, 128)))
+        with self.assertRaises(ExhaustedError):
+            allocator.allocate()
+
+    def test_sharded_permutation_exhausts(self):
+        allocator = PermutationAllocator(0, 10, shard=1, shard_count=3)
+        self.assertEqual(len(_drain(allocator, 3)), 3)
+        with self.assertRaises(ExhaustedError):
+            allocator.allocate()
+
+    def test_sequence_exhausts_at_limit(self):
+        allocator = SequenceAllocator(start=1, limit=4)
+        self.assertEqual(_drain(allocator, 3), [1, 2, 3])
+        with self.assertRaises(ExhaustedError):
+            allocator.allocate()
+
+    def test_byte_range_exhausts(self):
+        allocator = create_allocator('byte', 'permutation', seed=5)
+        self.assertEqual(len(set(_drain(allocator, 127))), 127)
+        with self.assertRaises(ExhaustedError):
+            allocator.allocate()
+
+    def test_nth_beyond_capacity(self):
+        with self.assertRaises(ExhaustedError):
+            PermutationAllocator(0, 10, shard=0, shard_count=3).nth(4)
+        with self.assertRaises(ExhaustedError):
+            SequenceAllocator(limit=10).nth(9)
+
+
+class NthAndCloneTest(unittest.TestCase):
+    def test_nth_distinct_for_same_seed(self):
+        for allocator in (SequenceAllocator(), PermutationAllocator(1, 1000, seed=2),
+                          UniqueStringAllocator(length=2, seed=2)):
+            for seed in (0, 17, 999):
+                with self.subTest(allocator=type(allocator).__name__, seed=seed):
+                    values = [allocator.nth(index, seed) for index in range(500)]
+                    self.assertEqual(len(values), len(set(values)))
+
+    def test_nth_does_not_advance(self):
+        allocator = PermutationAllocator(1, 1000, seed=2)
+        allocator.nth(0)
+        allocator.nth(1)
+        self.assertEqual(allocator.allocate(), allocator.clone().nth(0))
+
+    def test_clone_restarts(self):
+        for allocator in (SequenceAllocator(start=5), PermutationAllocator(1, 1000, seed=9),
+                          UniqueStringAllocator(seed=9)):
+            with self.subTest(allocator=type(allocator).__name__):
+                first = _drain(allocator, 10)
+                self.assertEqual(_drain(allocator.clone(), 10), first)
+
+    def test_create_allocator_types(self):
+        self.assertIsInstance(create_allocator('int'), SequenceAllocator)
+        self.assertIsInstance(create_allocator('Long', 'permutation'), PermutationAllocator)
+        self.assertIsInstance(create_allocator('String'), UniqueStringAllocator)
+        self.assertIsNone(create_allocator('double'))
+        with self.assertRaises(ValueError):
+            create_allocator('int', 'random')
+
+
+if __name__ == '__main__':
+    unittest.main()
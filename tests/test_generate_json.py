@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_json import JsonGenerator, dumps_json
+from parse_java import JavaEntityParser
+
+CYCLE_MODEL = '''
+public class Node {
+    private String name;
+    private Node next;
+    private List<Node> children;
+    private Leaf leaf;
+    private Leaf other;
+    private Map<String, Node> byName;
+}
+class Leaf { private int size; }
+class A { private B b; private int x; }
+class B { private A a; }
+'''
+
+
+def _shape(value):
+    """只保留结构：字典的键和嵌套关系，标量替换为类型名"""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shape(item) for item in value]
+    return type(value).__name__
+
+
+def _chain_info(depth: int) -> dict:
+    """C0 -> C1 -> ... -> C{depth-1} 的深层嵌套模型，直接构造避免解析大量代码"""
+    classes = []
+    for index in range(depth):
+        fields = [{'name': 'value', 'type': 'int', 'fieldType': 'primitive',
+                   'modifiers': ['private'], 'annotations': [], 'isArray': False}]
+        if index + 1 < depth:
+            fields.append({'name': 'child', 'type': f'C{index + 1}', 'fieldType': 'custom',
+                           'modifiers': ['private'], 'annotations': [], 'isArray': False})
+        classes.append({'name': f'C{index}', 'modifiers': [], 'annotations': [], 'extends': None,
+                        'implements': [], 'fields': fields})
+    return {'classes': classes, 'enums': []}
+
+
+class DumpsJsonTest(unittest.TestCase):
+    VALUES = [
+        None, True, False, 0, -7, 2 ** 70, 1.5, -0.0, 1e300, '', 'plain', '中文 "引号" \\ \n\t\x01',
+        [], {}, [[]], [{}], {'a': []}, [1, 'two', None, [3.5, {'x': {}}]],
+        {'nested': {'list': [1, 2, {'deep': [True, False]}], 'empty': {}}, 'emoji': '\U0001F600'},
+        {1: 'int key', 2.5: 'float key', True: 'bool key', None: 'null key'},
+    ]
+
+    def test_matches_json_dumps(self):
+        for value in self.VALUES:
+            for indent in (None, 0, 2, 4):
+                with self.subTest(value=value, indent=indent):
+                    self.assertEqual(dumps_json(value, indent),
+                                     json.dumps(value, indent=indent, ensure_ascii=False))
+
+    def test_matches_json_dumps_with_separators(self):
+        for value in self.VALUES:
+            for indent, separators in ((None, (',', ':')), (2, (',', ': ')), (None, (' , ', ' : '))):
+                with self.subTest(value=value, indent=indent, separators=separators):
+                    self.assertEqual(dumps_json(value, indent, separators),
+                                     json.dumps(value, indent=indent, separators=separators,
+                                                ensure_ascii=False))
+
+    def test_deeply_nested_value(self):
+        value = current = {}
+        for _ in range(5000):
+            current['child'] = current = {}
+        # 嵌套深度超过解释器递归限制，json.dumps 会失败
+        text = dumps_json(value, 2)
+        self.assertTrue(text.startswith('{\n  "child": {\n    "child": {'))
+        self.assertEqual(text.count('"child"'), 5000)
+
+
+class JsonGeneratorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.parsed_info = JavaEntityParser(CYCLE_MODEL).get_parsed_info()
+
+    def test_cycles_match_baseline_structure(self):
+        # 原实现在类已出现在当前路径上时返回 {}，max_cycle_depth=1 时结构应与之一致
+        generator = JsonGenerator(self.parsed_info, max_cycle_depth=1)
+        example = generator.generate_example('Node')
+        # Map 的键是随机字符串，单独检查
+        example.pop('byName')
+        self.assertEqual(_shape(example), {
+            'name': 'str',
+            'next': {},
+            'children': [{}],
+            'leaf': {'size': 'int'},
+            'other': {'size': 'int'},
+        })
+        self.assertEqual(_shape(generator.generate_example('A')), {'b': {'a': {}}, 'x': 'int'})
+
+    def test_map_values_truncated_at_cycle(self):
+        generator = JsonGenerator(self.parsed_info, max_cycle_depth=1)
+        by_name = generator.generate_example('Node')['byName']
+        self.assertEqual(len(by_name), 1)
+        key, value = next(iter(by_name.items()))
+        self.assertIsInstance(key, str)
+        self.assertEqual(value, {})
+
+    def test_deeper_cycle_limit(self):
+        generator = JsonGenerator(self.parsed_info, max_cycle_depth=2)
+        example = generator.generate_example('A')
+        self.assertEqual(_shape(example), {'b': {'a': {'b': {'a': {}}, 'x': 'int'}}, 'x': 'int'})
+
+    def test_seeded_output_is_reproducible(self):
+        generator = JsonGenerator(self.parsed_info)
+        self.assertEqual(generator.generate_example('Node', seed=3), generator.generate_example('Node', seed=3))
+
+    def test_to_json_deep_chain(self):
+        generator = JsonGenerator(_chain_info(1500))
+        text = generator.to_json('C0')
+        self.assertEqual(text.count('"child"'), 1499)
+        self.assertEqual(text.count('"value"'), 1500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infer_java import iter_json_values
+
+RECORDS = [
+    {'id': 1, 'name': '张三', 'tags': ['a', 'b'], 'score': 12345.678},
+    {'id': 22, 'nested': {'list': [{'x': 1}, {'y': [2, 3]}], 'empty': {}}, 'flag': True},
+    {'id': 333, 'text': 'comma, bracket ] brace } "quote"', 'none': None, 'emoji': '\U0001F600'},
+    [1, 2, [3, 4]],
+    -1000000,
+    'plain string',
+]
+
+CHUNK_SIZES = (1, 2, 3, 7, 64)
+
+
+class IterJsonValuesTest(unittest.TestCase):
+    def _decode(self, text: str, chunk_size: int) -> list:
+        return list(iter_json_values(io.StringIO(text), chunk_size=chunk_size))
+
+    def _assert_decodes(self, text: str, expected: list):
+        # 小块读取使记录、数字和多字节字符落在块边界上
+        for chunk_size in CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self._decode(text, chunk_size), expected)
+
+    def test_ndjson(self):
+        text = '\n'.join(json.dumps(record, ensure_ascii=False) for record in RECORDS) + '\n'
+        self._assert_decodes(text, RECORDS)
+
+    def test_ndjson_with_blank_lines_and_crlf(self):
+        text = '\r\n\r\n'.join(json.dumps(record, ensure_ascii=False) for record in RECORDS) + '\r\n\n'
+        self._assert_decodes(text, RECORDS)
+
+    def test_json_array(self):
+        self._assert_decodes(json.dumps(RECORDS, ensure_ascii=False), RECORDS)
+
+    def test_indented_json_array(self):
+        self._assert_decodes('  \n' + json.dumps(RECORDS, indent=4, ensure_ascii=False) + '\n  ', RECORDS)
+
+    def test_numbers_at_chunk_boundaries(self):
+        # 数字可能被截断成 12 和 345，只有确认后面还有内容时才能解码
+        numbers = [12345, 6, 78.9, -10, 1e21]
+        self._assert_decodes('\n'.join(json.dumps(number) for number in numbers), numbers)
+        self._assert_decodes(json.dumps(numbers), numbers)
+
+    def test_single_value_without_newline(self):
+        self._assert_decodes('{"a": 1}', [{'a': 1}])
+        self._assert_decodes('42', [42])
+
+    def test_empty_input(self):
+        self._assert_decodes('', [])
+        self._assert_decodes(' \n ', [])
+        self._assert_decodes('[]', [])
+        self._assert_decodes('[ ]', [])
+
+    def test_truncated_input_raises(self):
+        for chunk_size in CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                with self.assertRaises(json.JSONDecodeError):
+                    self._decode('{"a": 1}\n{"b": [1, 2', chunk_size)
+
+    def test_large_record(self):
+        record = {'items': [{'index': index, 'value': 'v' * 50} for index in range(2000)]}
+        self.assertEqual(self._decode(json.dumps([record, record]), 16), [record, record])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shards import ShardedWriter
+
+
+class ShardedWriterErrorTest(unittest.TestCase):
+    def _close_in_thread(self, writer: ShardedWriter) -> list:
+        """在线程中调用 close，返回 [异常]；超时说明 close 卡住"""
+        result = []
+
+        def run():
+            try:
+                writer.close()
+            except BaseException as e:
+                result.append(e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "close() hung after the writer thread failed")
+        return result
+
+    def test_close_raises_when_shard_cannot_be_opened(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            # 与分片同名的目录使写线程打开文件失败
+            os.makedirs(os.path.join(output_dir, 'part-00000.jsonl'))
+            writer = ShardedWriter(output_dir, max_records=10)
+            writer.write({'id': 1})
+            errors = self._close_in_thread(writer)
+            self.assertEqual(len(errors), 1)
+            self.assertIsInstance(errors[0], OSError)
+            self.assertFalse(os.path.exists(os.path.join(output_dir, 'manifest.json')))
+
+    def test_write_raises_after_writer_thread_failed(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            os.makedirs(os.path.join(output_dir, 'part-00000.jsonl'))
+            writer = ShardedWriter(output_dir, max_records=1, queue_size=1)
+            with self.assertRaises(OSError):
+                # 队列很小，写线程出错后生产者应当很快收到异常而不是阻塞
+                for index in range(10000):
+                    writer.write({'id': index, 'payload': 'x' * 1024})
+            self._close_in_thread(writer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import os
+import threading
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from archive_source import build_parsed_info
+from generate_json import JsonGenerator
+from parse_java import JavaEntityParser
+from subtree_cache import SubtreeCache
+
+
+def _generic_types(generic_info: Dict[str, Any]) -> Iterable[str]:
+    """展开泛型信息中引用的全部类型名"""
+    stack = [generic_info]
+    while stack:
+        generic = stack.pop()
+        yield generic['rawType']
+        for arg in generic['typeArguments']:
+            if isinstance(arg, dict):
+                stack.append(arg)
+            else:
+                yield arg
+
+
+def referenced_types(class_info: Dict[str, Any]) -> Set[str]:
+    """获取类引用的类型：字段类型、泛型参数及父类"""
+    types = set()
+    for field in class_info['fields']:
+        types.add(field['type'])
+        if field.get('genericInfo'):
+            types.update(_generic_types(field['genericInfo']))
+    if class_info.get('extends'):
+        types.add(class_info['extends'])
+    types.discard(class_info['name'])
+    return types
+
+
+class DependencyGraph:
+    """类 -> 字段类型引用的依赖图，同时维护反向索引"""
+
+    def __init__(self):
+        self.forward: Dict[str, Set[str]] = {}
+        self.reverse: Dict[str, Set[str]] = defaultdict(set)
+
+    def update(self, class_info: Dict[str, Any]):
+        """新增或替换一个类的依赖"""
+        self.remove(class_info['name'])
+        types = referenced_types(class_info)
+        self.forward[class_info['name']] = types
+        for type_name in types:
+            self.reverse[type_name].add(class_info['name'])
+
+    def remove(self, class_name: str):
+        """移除一个类的依赖"""
+        for type_name in self.forward.pop(class_name, ()):
+            dependents = self.reverse.get(type_name)
+            if dependents is not None:
+                dependents.discard(class_name)
+                if not dependents:
+                    del self.reverse[type_name]
+
+    def dependents(self, type_names: Iterable[str]) -> Set[str]:
+        """返回传递依赖于给定类型的所有类（包含类型自身）"""
+        result = set(type_names)
+        queue = deque(result)
+        while queue:
+            for dependent in self.reverse.get(queue.popleft(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    queue.append(dependent)
+        return result
+
+
+class SourceWatcher:
+    """轮询源码目录，只重新解析变更文件并重新生成受影响的类"""
+
+    def __init__(self, source_dir: str, output_dir: str, interval: float = 0.5,
+                 on_regenerate: Optional[Callable[[Set[str]], None]] = None,
+                 seed: Optional[int] = None, cache: Optional[SubtreeCache] = None):
+        """
+        seed: 指定时按种子生成，未修改的类输出的值保持不变
+        cache: 按种子生成时使用的子树缓存，默认使用内存缓存
+        """
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.interval = interval
+        self.on_regenerate = on_regenerate
+        self.seed = seed
+        self.cache = cache if cache is not None or seed is None else SubtreeCache()
+        self.graph = DependencyGraph()
+        self.classes: Dict[str, Dict[str, Any]] = {}
+        self.enums: Dict[str, Dict[str, Any]] = {}
+        self.file_types: Dict[str, Tuple[List[str], List[str]]] = {}  # 文件 -> (类名, 枚举名)
+        self.file_stats: Dict[str, Tuple[int, int]] = {}
+        self.errors: Dict[str, str] = {}
+        self.stop_event = threading.Event()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """获取目录下所有 Java 文件的 (mtime, size)"""
+        stats = {}
+        stack = [self.source_dir]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.java'):
+                        stat = entry.stat()
+                        stats[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def _unload(self, path: str) -> Set[str]:
+        """移除文件中定义的类型，返回被移除的类型名"""
+        class_names, enum_names = self.file_types.pop(path, ([], []))
+        for class_name in class_names:
+            self.classes.pop(class_name, None)
+            self.graph.remove(class_name)
+        for enum_name in enum_names:
+            self.enums.pop(enum_name, None)
+        return set(class_names) | set(enum_names)
+
+    def _parse(self, path: str) -> Optional[Dict[str, Any]]:
+        """解析单个文件，失败时记录错误并返回 None"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                info = JavaEntityParser(f.read()).get_parsed_info()
+        except (OSError, ValueError) as e:
+            self.errors[path] = str(e)
+            return None
+        self.errors.pop(path, None)
+        return info
+
+    def _load(self, path: str, info: Dict[str, Any]) -> Set[str]:
+        """载入文件的解析结果，返回其中定义的类型名"""
+        for class_info in info['classes']:
+            self.classes[class_info['name']] = class_info
+            self.graph.update(class_info)
+        for enum_info in info['enums']:
+            self.enums[enum_info['name']] = enum_info
+        class_names = [class_info['name'] for class_info in info['classes']]
+        enum_names = [enum_info['name'] for enum_info in info['enums']]
+        self.file_types[path] = (class_names, enum_names)
+        return set(class_names) | set(enum_names)
+
+    def _output_path(self, class_name: str) -> str:
+        return os.path.join(self.output_dir, f"{class_name}.json")
+
+    def _regenerate(self, class_names: Set[str]):
+        """重新生成指定类的输出，已删除的类同时删除输出文件"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        generator = JsonGenerator(build_parsed_info(self.classes, self.enums), cache=self.cache)
+        for class_name in class_names:
+            output_path = self._output_path(class_name)
+            if class_name in self.classes:
+                tmp_path = output_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(generator.to_json(class_name, seed=self.seed))
+                os.replace(tmp_path, output_path)
+            elif os.path.exists(output_path):
+                os.remove(output_path)
+
+    def poll_once(self) -> Set[str]:
+        """检查一次文件变更，返回重新生成的类名"""
+        stats = self._scan()
+        changed_types: Set[str] = set()
+        for path in self.file_stats.keys() - stats.keys():
+            changed_types |= self._unload(path)
+        for path, stat in stats.items():
+            if self.file_stats.get(path) != stat:
+                info = self._parse(path)
+                if info is None:
+                    # 编辑过程中的临时语法错误：保留上次成功解析的类型和输出，只记录错误
+                    continue
+                changed_types |= self._unload(path)
+                changed_types |= self._load(path, info)
+        self.file_stats = stats
+        if not changed_types:
+            return set()
+
+        affected = {name for name in self.graph.dependents(changed_types)
+                    if name in self.classes or name in changed_types}
+        # 枚举本身不生成输出
+        affected -= self.enums.keys()
+        self._regenerate(affected)
+        if self.on_regenerate:
+            self.on_regenerate(affected)
+        return affected
+
+    def run(self):
+        """持续轮询直到调用 stop()"""
+        while not self.stop_event.is_set():
+            self.poll_once()
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="监听 Java 源码目录并增量生成 JSON 示例")
+    arg_parser.add_argument("source_dir", help="Java 源码目录")
+    arg_parser.add_argument("output_dir", help="JSON 输出目录")
+    arg_parser.add_argument("--interval", type=float, default=0.5, help="轮询间隔（秒）")
+    arg_parser.add_argument("--seed", type=int, help="按种子生成，未修改的类输出保持不变")
+    arg_parser.add_argument("--cache-dir", help="子树缓存目录，重启后仍可复用")
+    args = arg_parser.parse_args()
+
+    def report(classes: Set[str]):
+        print(f"[{time.strftime('%H:%M:%S')}] regenerated {len(classes)}: {', '.join(sorted(classes))}")
+
+    watcher = SourceWatcher(args.source_dir, args.output_dir, args.interval, on_regenerate=report,
+                            seed=args.seed, cache=SubtreeCache(directory=args.cache_dir) if args.cache_dir else None)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()